@@ -5,7 +5,10 @@ API_HOST=0.0.0.0
 API_PORT=${API_PORT:-5000}
 API_WORKERS=${API_WORKERS:-3}
 API_WORKER_MAX_REQUESTS=${API_WORKER_MAX_REQUESTS:-10000}
-CELERY_WORKER_CONCURRENCY=${CELERY_WORKER_CONCURRENCY:-2}
+# Exported, since it also sizes the MongoDB connection pool of each process.
+export CELERY_WORKER_CONCURRENCY=${CELERY_WORKER_CONCURRENCY:-2}
+# The C++ protobuf runtime is an order of magnitude faster at serializing large batches.
+export PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=${PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION:-cpp}
 
 case "$1" in
     api) poetry run gunicorn immuni_exposure_ingestion.sanic:sanic_app \
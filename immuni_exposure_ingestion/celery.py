@@ -14,12 +14,13 @@
 import asyncio
 from typing import Any, Tuple
 
-from celery.signals import worker_process_init, worker_process_shutdown
+from celery.signals import celeryd_init, worker_process_init, worker_process_shutdown
 
 from immuni_common.celery import CeleryApp, Schedule, string_to_crontab
 from immuni_exposure_ingestion import tasks
 from immuni_exposure_ingestion.core import config
 from immuni_exposure_ingestion.core.managers import managers
+from immuni_exposure_ingestion.protobuf.helpers.generate_zip import check_protobuf_implementation
 
 
 # pylint: disable=cyclic-import,import-outside-toplevel
@@ -43,6 +44,14 @@ def _get_schedules() -> Tuple[Schedule, ...]:
     )
 
 
+@celeryd_init.connect
+def celeryd_init_listener(**kwargs: Any) -> None:
+    """
+    Callback on worker startup, before the pool processes are created.
+    """
+    check_protobuf_implementation()  # pragma: no cover
+
+
 @worker_process_init.connect
 def worker_process_init_listener(**kwargs: Any) -> None:
     """
@@ -25,6 +25,16 @@ _LOGGER = logging.getLogger(__name__)
 EXPOSURE_MONGO_URL: str = config(
     "EXPOSURE_MONGO_URL", default="mongodb://localhost:27017/immuni-exposure-ingestion-dev"
 )
+# Every process has its own MongoDB connection pool, shared by its threads. By default, the pool is
+# sized so that the CELERY_WORKER_CONCURRENCY processes of a Celery worker open up to 100
+# connections overall, and threads fail after waiting 5 seconds for a connection to be available.
+CELERY_WORKER_CONCURRENCY: int = config("CELERY_WORKER_CONCURRENCY", cast=int, default=2)
+EXPOSURE_MONGO_MAX_CONNECTIONS: int = config(
+    "EXPOSURE_MONGO_MAX_CONNECTIONS", cast=int, default=max(1, 100 // CELERY_WORKER_CONCURRENCY)
+)
+EXPOSURE_MONGO_WAIT_QUEUE_TIMEOUT_MILLIS: int = config(
+    "EXPOSURE_MONGO_WAIT_QUEUE_TIMEOUT_MILLIS", cast=int, default=5000
+)
 
 OTP_CACHE_REDIS_URL: str = config("OTP_CACHE_REDIS_URL", default="redis://localhost:6379/0")
 OTP_CACHE_REDIS_MAX_CONNECTIONS: int = config(
@@ -65,6 +75,8 @@ DUMMY_DATA_TOKEN_ERROR_CHANCE_PERCENT: int = config(
 # Following Google's suggestion, some slack is given here by setting it to 30.
 MAX_KEYS_PER_UPLOAD: int = config("MAX_KEYS_PER_UPLOAD", cast=int, default=30)
 MAX_KEYS_PER_BATCH: int = config("MAX_KEYS_PER_BATCH", cast=int, default=10000)
+# The number of uploads fetched per database round trip while processing them.
+UPLOADS_PROCESSING_BATCH_SIZE: int = config("UPLOADS_PROCESSING_BATCH_SIZE", cast=int, default=1000)
 
 DAYS_BEFORE_SYMPTOMS_TO_CONSIDER_KEY_AT_RISK: int = config(
     "DAYS_BEFORE_SYMPTOMS_TO_CONSIDER_KEY_AT_RISK", cast=int, default=2
@@ -89,7 +89,13 @@ class Managers(BaseManagers):
         Initialize managers on demand.
         """
         await super().initialize()
-        self._exposure_mongo = connect(host=config.EXPOSURE_MONGO_URL)
+        # A single client per process, whose connection pool is shared by all of the threads
+        # (e.g., the concurrent batch creations of the Celery tasks).
+        self._exposure_mongo = connect(
+            host=config.EXPOSURE_MONGO_URL,
+            maxPoolSize=config.EXPOSURE_MONGO_MAX_CONNECTIONS,
+            waitQueueTimeoutMS=config.EXPOSURE_MONGO_WAIT_QUEUE_TIMEOUT_MILLIS,
+        )
         self._analytics_redis = await aioredis.create_redis_pool(
             address=config.ANALYTICS_BROKER_REDIS_URL,
             encoding="utf-8",
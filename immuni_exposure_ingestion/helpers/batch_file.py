@@ -0,0 +1,148 @@
+#    Copyright (C) 2020 Presidenza del Consiglio dei Ministri.
+#    Please refer to the AUTHORS file for more information.
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Affero General Public License for more details.
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+import logging
+from concurrent.futures import Future
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Type, Union
+
+from bson import ObjectId
+from mongoengine import QuerySet
+
+from immuni_common.models.mongoengine.batch_file import BatchFile
+from immuni_common.models.mongoengine.batch_file_eu import BatchFileEu
+from immuni_common.models.mongoengine.temporary_exposure_key import TemporaryExposureKey
+from immuni_exposure_ingestion.core import config
+from immuni_exposure_ingestion.models.upload import Upload
+from immuni_exposure_ingestion.models.upload_eu import UploadEu
+from immuni_exposure_ingestion.protobuf.helpers.generate_zip import batch_to_sdk_zip_file
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BatchOutcome(NamedTuple):
+    """
+    The outcome of the creation of a batch out of the unprocessed uploads.
+    The index is None if no batch has been created, the number of uploads left to be processed is
+    None if there was nothing to process.
+    """
+
+    index: Optional[int]
+    n_keys: int
+    n_enqueued: Optional[int]
+
+
+def create_batch(
+    description: str,
+    batch_cls: Union[Type[BatchFile], Type[BatchFileEu]],
+    last_period: datetime,
+    last_index: int,
+    now: datetime,
+    uploads: QuerySet,
+    upload_cls: Union[Type[Upload], Type[UploadEu]],
+    extract_keys: Callable[[Any, List[TemporaryExposureKey]], Iterable[TemporaryExposureKey]],
+    preceding_batch: Optional[Future] = None,
+    **batch_attributes: Any,
+) -> BatchOutcome:
+    """
+    Create a batch out of the given unprocessed uploads, and flag them as published.
+    When the maximum number of keys for a single batch is reached, create the batch, and leave the
+    remaining uploads to be processed on another run.
+
+    :param description: the description of the uploads, for logging purposes.
+    :param batch_cls: the model of the batch to create.
+    :param last_period: the end of the period of the latest batch, the start of the batch.
+    :param last_index: the index of the latest batch.
+    :param now: the end of the period of the batch.
+    :param uploads: the unprocessed uploads.
+    :param upload_cls: the model of the unprocessed uploads.
+    :param extract_keys: the function extracting the keys to publish out of an upload and its keys.
+    :param preceding_batch: the future of the batch to be stored right before this one, if any,
+      returning its outcome. Its exception, if any, is raised without completing the batch.
+    :param batch_attributes: the additional attributes of the batch.
+    :return: the outcome of the creation of the batch.
+    """
+    _LOGGER.info("Start processing %s TEKs.", description)
+
+    _LOGGER.info(
+        "Starting to process %s uploads.",
+        description,
+        extra=dict(period_start=last_period, period_end=now),
+    )
+
+    # Probe for a single id, rather than counting all of the matching documents, since there is
+    # nothing to process in the common case in between periods. The gauges are left untouched.
+    if uploads.only("id").first() is None:
+        _LOGGER.info("End processing %s TEKs.", description)
+        return BatchOutcome(index=None, n_keys=0, n_enqueued=None)
+
+    n_uploads = uploads.count()
+
+    _LOGGER.info("%s uploads have been fetched.", description, extra=dict(n_uploads=n_uploads))
+
+    processed_uploads: List[ObjectId] = []
+    keys: List[TemporaryExposureKey] = []
+    # NOTE: Uploads are consumed as a whole, so that none of them is ever partially published, and
+    #  their keys are filtered based on the symptoms onset. Hence, the keys cannot be limited and
+    #  sorted server-side (e.g., by means of an aggregation pipeline).
+    for upload in uploads:
+        if (reached := len(keys) + len(upload_keys := upload.keys)) > config.MAX_KEYS_PER_BATCH:
+            _LOGGER.warning(
+                "Early stop: reached maximum number of keys per batch of %s uploads.",
+                description,
+                extra=dict(pre_reached=len(keys), reached=reached, max=config.MAX_KEYS_PER_BATCH),
+            )
+            break
+        keys.extend(extract_keys(upload, upload_keys))
+        processed_uploads.append(upload.id)
+
+    # The preceding batch (if any) must be stored before completing this one, so that indexes are
+    # consecutive. If it failed, its exception is raised here, before storing this batch and
+    # flagging its uploads as published.
+    if preceding_batch is not None and (preceding_index := preceding_batch.result().index):
+        last_index = preceding_index
+
+    index: Optional[int] = None
+    if (n_keys := len(keys)) > 0:
+        # Sort the keys. This randomizes their order (since they are random strings) so that
+        # keys of the same device are no more likely to end up consecutively.
+        keys.sort(key=attrgetter("key_data"))
+
+        index = last_index + 1
+
+        batch_file = batch_cls(
+            index=index,
+            keys=keys,
+            period_start=last_period,
+            period_end=now,
+            sub_batch_index=1,
+            sub_batch_count=1,
+            **batch_attributes,
+        )
+        batch_file.client_content = batch_to_sdk_zip_file(batch_file)
+        batch_file.save()
+        _LOGGER.info("Created new %s batch.", description, extra=dict(index=index, n_keys=n_keys))
+
+    upload_cls.set_published(processed_uploads)
+    _LOGGER.info(
+        "Flagged %s uploads as published.",
+        description,
+        extra=dict(n_processed_uploads=len(processed_uploads)),
+    )
+
+    _LOGGER.info("End processing %s TEKs.", description)
+    # Uploads stored after the count may have been processed too, hence the clamping.
+    return BatchOutcome(
+        index=index, n_keys=n_keys, n_enqueued=max(0, n_uploads - len(processed_uploads))
+    )
@@ -13,17 +13,20 @@
 
 import logging
 from datetime import datetime, timedelta
-from typing import Iterable
+from typing import Iterable, List, Optional
 
 from immuni_common.models.enums import TransmissionRiskLevel
 from immuni_common.models.mongoengine.temporary_exposure_key import TemporaryExposureKey
 from immuni_exposure_ingestion.core import config
 from immuni_exposure_ingestion.models.upload import Upload
+from immuni_exposure_ingestion.models.upload_eu import UploadEu
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def extract_keys_with_risk_level_from_upload(upload: Upload) -> Iterable[TemporaryExposureKey]:
+def extract_keys_with_risk_level_from_upload(
+    upload: Upload, keys: Optional[List[TemporaryExposureKey]] = None
+) -> Iterable[TemporaryExposureKey]:
     """
     Return the keys of the given upload that are considered at risk of transmission.
     The algorithm currently considers at maximum risk all of the keys created after two days before
@@ -32,6 +35,7 @@ def extract_keys_with_risk_level_from_upload(upload: Upload) -> Iterable[Tempora
     It will also remove any keys that might still be valid.
 
     :param upload: the upload whose keys are to be extracted from.
+    :param keys: the keys of the upload, if already retrieved.
     :return: the list of the given upload's keys that are considered at risk of transmission.
     """
 
@@ -39,7 +43,10 @@ def extract_keys_with_risk_level_from_upload(upload: Upload) -> Iterable[Tempora
         days=config.DAYS_BEFORE_SYMPTOMS_TO_CONSIDER_KEY_AT_RISK
     )
 
-    keys_at_risk = [key for key in upload.keys if key.created_at.date() >= first_risky_time]
+    if keys is None:
+        keys = upload.keys
+
+    keys_at_risk = [key for key in keys if key.created_at.date() >= first_risky_time]
     set_highest_risk_level(keys_at_risk)
 
     # TODO: Handle current day TEKs (if any) instead of discarding them.
@@ -55,7 +62,7 @@ def extract_keys_with_risk_level_from_upload(upload: Upload) -> Iterable[Tempora
             upload_id=str(upload.id),
             symptoms_started_on=upload.symptoms_started_on,
             first_risky_time=first_risky_time,
-            n_keys_upload=len(upload.keys),
+            n_keys_upload=len(keys),
             n_keys_at_risk=len(keys_at_risk),
             n_keys_at_risk_filtered=len(keys_at_risk_filtered),
         ),
@@ -64,6 +71,20 @@ def extract_keys_with_risk_level_from_upload(upload: Upload) -> Iterable[Tempora
     return keys_at_risk_filtered
 
 
+def extract_keys_with_highest_risk_level(
+    _upload: UploadEu, keys: List[TemporaryExposureKey]
+) -> List[TemporaryExposureKey]:
+    """
+    Return the keys of the given EU upload, all of them considered at the highest risk.
+
+    :param _upload: the EU upload whose keys are to be extracted from.
+    :param keys: the keys of the EU upload.
+    :return: the list of the given upload's keys.
+    """
+    set_highest_risk_level(keys)
+    return keys
+
+
 def set_highest_risk_level(keys: Iterable[TemporaryExposureKey]) -> None:
     """
     Set to highest "transmission_risk_level" for each keys.
@@ -22,6 +22,7 @@ from mongoengine import BooleanField, DateField, Document, EmbeddedDocumentListF
 from pymongo.cursor import Cursor
 
 from immuni_common.models.mongoengine.temporary_exposure_key import TemporaryExposureKey
+from immuni_exposure_ingestion.core import config
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,10 +42,16 @@ class Upload(Document):
     def to_process(cls) -> Cursor:
         """
         Fetch all of the Uploads yet to be processed.
+        Only the fields needed to process the Uploads are loaded, in large cursor batches.
 
         :return: the cursor that iterates over Uploads that are yet to be processed.
         """
-        return cls.objects.filter(to_publish=True).order_by("id")
+        return (
+            cls.objects.filter(to_publish=True)
+            .order_by("id")
+            .only("id", "keys", "symptoms_started_on")
+            .batch_size(config.UPLOADS_PROCESSING_BATCH_SIZE)
+        )
 
     @classmethod
     def unprocessed_before(cls, datetime_: datetime) -> bool:
@@ -55,9 +62,12 @@ class Upload(Document):
         :return: True if there are unprocessed Uploads older than the specified datetime, False
           otherwise.
         """
+        # Probe for a single id, rather than counting all of the matching documents.
         return (
-            cls.objects.filter(id__lte=ObjectId.from_datetime(datetime_), to_publish=True).count()
-            > 0
+            cls.objects.filter(id__lte=ObjectId.from_datetime(datetime_), to_publish=True)
+            .only("id")
+            .first()
+            is not None
         )
 
     @classmethod
@@ -67,7 +77,8 @@ class Upload(Document):
 
         :param ids: the list of ids of the Uploads to mark as published.
         """
-        cls.objects(id__in=ids).update(to_publish=False)
+        # A single raw update_many, skipping the QuerySet machinery.
+        cls._get_collection().update_many({"_id": {"$in": ids}}, {"$set": {"to_publish": False}})
 
     @classmethod
     def delete_older_than(cls, datetime_: datetime) -> int:
@@ -22,6 +22,7 @@ from mongoengine import BooleanField, Document, EmbeddedDocumentListField, Strin
 from pymongo.cursor import Cursor
 
 from immuni_common.models.mongoengine.temporary_exposure_key import TemporaryExposureKey
+from immuni_exposure_ingestion.core import config
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -59,10 +60,16 @@ class UploadEu(Document):
     def to_process(cls, country_: str) -> Cursor:
         """
         Fetch all of the Uploads by country yet to be processed.
+        Only the fields needed to process the Uploads are loaded, in large cursor batches.
 
         :return: the cursor that iterates over Uploads by country that are yet to be processed.
         """
-        return cls.objects.filter(to_publish=True, country=country_).order_by("id")
+        return (
+            cls.objects.filter(to_publish=True, country=country_)
+            .order_by("id")
+            .only("id", "keys")
+            .batch_size(config.UPLOADS_PROCESSING_BATCH_SIZE)
+        )
 
     @classmethod
     def unprocessed_before(cls, datetime_: datetime) -> bool:
@@ -73,9 +80,12 @@ class UploadEu(Document):
         :return: True if there are unprocessed Uploads older than the specified datetime, False
           otherwise.
         """
+        # Probe for a single id, rather than counting all of the matching documents.
         return (
-            cls.objects.filter(id__lte=ObjectId.from_datetime(datetime_), to_publish=True).count()
-            > 0
+            cls.objects.filter(id__lte=ObjectId.from_datetime(datetime_), to_publish=True)
+            .only("id")
+            .first()
+            is not None
         )
 
     @classmethod
@@ -85,7 +95,8 @@ class UploadEu(Document):
 
         :param ids: the list of ids of the Uploads to mark as published.
         """
-        cls.objects(id__in=ids).update(to_publish=False)
+        # A single raw update_many, skipping the QuerySet machinery.
+        cls._get_collection().update_many({"_id": {"$in": ids}}, {"$set": {"to_publish": False}})
 
     @classmethod
     def delete_older_than(cls, datetime_: datetime) -> int:
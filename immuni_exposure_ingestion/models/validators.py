@@ -120,16 +120,12 @@ class TekListValidator(Validator):
         :raises: ValidationError in case at least one TEK is deemed invalid.
         """
 
-        valid_teks = list()
         today_teks = list()
         _now_rolling_start_number = now_rolling_start_number()
         _today_midnight_rolling_start_number = today_midnight_rolling_start_number()
 
         for tek in teks:
-
-            if _ROLLING_PERIOD_MIN <= tek.rolling_period <= _ROLLING_PERIOD_MAX:
-                valid_teks.append(tek)
-            else:
+            if not _ROLLING_PERIOD_MIN <= tek.rolling_period <= _ROLLING_PERIOD_MAX:
                 # The TEK is not coming from the exposure notification framework: immediate short
                 # circuit.
                 raise ValidationError(
@@ -157,7 +153,6 @@ class TekListValidator(Validator):
                 "They could be later ignored based on a configuration variable.",
                 extra=dict(
                     n_teks=len(teks),
-                    n_valid_teks=len(valid_teks),
                     n_today_teks=len(today_teks),
                     today_rolling_periods=list(tek.rolling_period for tek in today_teks),
                     EXCLUDE_CURRENT_DAY_TEK=config.EXCLUDE_CURRENT_DAY_TEK,
@@ -1,12 +1,11 @@
 from functools import wraps
-from typing import Any, Callable, Coroutine
+from typing import Any, Callable, Coroutine, Dict, Tuple
 
+from prometheus_client.metrics import Counter
+from sanic.request import Request
 from sanic.response import HTTPResponse
 
 from immuni_common.core.exceptions import ApiException
-from immuni_common.helpers.sanic import validate
-from immuni_common.models.enums import Location
-from immuni_common.models.marshmallow.fields import IntegerBoolField
 from immuni_common.models.swagger import HeaderImmuniDummyData
 from immuni_exposure_ingestion.monitoring.api import (
     CHECK_CUN_REQUESTS,
@@ -16,106 +15,50 @@ from immuni_exposure_ingestion.monitoring.api import (
 )
 
 
-def monitor_upload(f: Callable[..., Coroutine[Any, Any, HTTPResponse]]) -> Callable:
+def _monitor_requests(
+    counter: Counter, include_province: bool = False
+) -> Callable[[Callable[..., Coroutine[Any, Any, HTTPResponse]]], Callable]:
     """
-    Decorator to monitor the metrics relative to the upload request.
-    :param f: the upload function to decorate.
-    :return: the decorated function.
-    """
-
-    @wraps(f)
-    @validate(
-        location=Location.HEADERS,
-        is_dummy=IntegerBoolField(
-            required=True, allow_strings=True, data_key=HeaderImmuniDummyData.DATA_KEY,
-        ),
-    )
-    async def _wrapper(*args: Any, is_dummy: bool, **kwargs: Any) -> HTTPResponse:
-        province = kwargs["province"]
-        try:
-            response = await f(*args, **kwargs)
-            UPLOAD_REQUESTS.labels(is_dummy, province, response.status).inc()
-        except ApiException as error:
-            UPLOAD_REQUESTS.labels(is_dummy, province, error.status_code.value).inc()
-            raise
-        return response
-
-    return _wrapper
-
-
-def monitor_check_otp(f: Callable[..., Coroutine[Any, Any, HTTPResponse]]) -> Callable:
-    """
-    Decorator to monitor the metrics relative to the check-otp request.
-    :param f: the check-otp function to decorate.
-    :return: the decorated function.
-    """
-
-    @wraps(f)
-    @validate(
-        location=Location.HEADERS,
-        is_dummy=IntegerBoolField(
-            required=True, allow_strings=True, data_key=HeaderImmuniDummyData.DATA_KEY,
-        ),
-    )
-    async def _wrapper(*args: Any, is_dummy: bool, **kwargs: Any) -> HTTPResponse:
-        try:
-            response = await f(*args, **kwargs)
-            CHECK_OTP_REQUESTS.labels(is_dummy, response.status).inc()
-        except ApiException as error:
-            CHECK_OTP_REQUESTS.labels(is_dummy, error.status_code.value).inc()
-            raise
-        return response
-
-    return _wrapper
-
+    Create a decorator to monitor the metrics relative to a request.
 
-def monitor_check_cun(f: Callable[..., Coroutine[Any, Any, HTTPResponse]]) -> Callable:
+    :param counter: the counter to increment once the request has been responded to.
+    :param include_province: whether the "province" argument of the request is a counter label.
+    :return: the decorator.
     """
-    Decorator to monitor the metrics relative to the check-cun request.
-    :param f: the check-cun function to decorate.
-    :return: the decorated function.
-    """
-
-    @wraps(f)
-    @validate(
-        location=Location.HEADERS,
-        is_dummy=IntegerBoolField(
-            required=True, allow_strings=True, data_key=HeaderImmuniDummyData.DATA_KEY,
-        ),
-    )
-    async def _wrapper(*args: Any, is_dummy: bool, **kwargs: Any) -> HTTPResponse:
-        try:
-            response = await f(*args, **kwargs)
-            CHECK_CUN_REQUESTS.labels(is_dummy, response.status).inc()
-        except ApiException as error:
-            CHECK_CUN_REQUESTS.labels(is_dummy, error.status_code.value).inc()
-            raise
-        return response
-
-    return _wrapper
-
-
-def monitor_get_dgc(f: Callable[..., Coroutine[Any, Any, HTTPResponse]]) -> Callable:
-    """
-    Decorator to monitor the metrics relative to the check-cun request.
-    :param f: the check-cun function to decorate.
-    :return: the decorated function.
-    """
-
-    @wraps(f)
-    @validate(
-        location=Location.HEADERS,
-        is_dummy=IntegerBoolField(
-            required=True, allow_strings=True, data_key=HeaderImmuniDummyData.DATA_KEY,
-        ),
-    )
-    async def _wrapper(*args: Any, is_dummy: bool, **kwargs: Any) -> HTTPResponse:
-        try:
-            response = await f(*args, **kwargs)
-            GET_DGC_REQUESTS.labels(is_dummy, response.status).inc()
-        except ApiException as error:
-            GET_DGC_REQUESTS.labels(is_dummy, error.status_code.value).inc()
-            raise
-        return response
-
-    return _wrapper
+    # The labelled children of the counter, so that each labels combination is resolved once.
+    children: Dict[Tuple[Any, ...], Any] = {}
+
+    def _inc(*labels: Any) -> None:
+        if (child := children.get(labels)) is None:
+            child = children[labels] = counter.labels(*labels)
+        child.inc()
+
+    def _decorator(f: Callable[..., Coroutine[Any, Any, HTTPResponse]]) -> Callable:
+        @wraps(f)
+        async def _wrapper(request: Request, *args: Any, **kwargs: Any) -> HTTPResponse:
+            # The dummy header is validated by the decorated view (i.e., handle_dummy_requests),
+            # reading its raw value is enough for labelling purposes.
+            dummy_header = request.headers.get(HeaderImmuniDummyData.DATA_KEY)
+            if dummy_header not in ("0", "1"):
+                # Requests with a missing or invalid header are rejected by the decorated view
+                # without being counted.
+                return await f(request, *args, **kwargs)
+            is_dummy = dummy_header == "1"
+            labels = (is_dummy, kwargs["province"]) if include_province else (is_dummy,)
+            try:
+                response = await f(request, *args, **kwargs)
+                _inc(*labels, response.status)
+            except ApiException as error:
+                _inc(*labels, error.status_code.value)
+                raise
+            return response
+
+        return _wrapper
+
+    return _decorator
+
+
+monitor_upload = _monitor_requests(UPLOAD_REQUESTS, include_province=True)
+monitor_check_otp = _monitor_requests(CHECK_OTP_REQUESTS)
+monitor_check_cun = _monitor_requests(CHECK_CUN_REQUESTS)
+monitor_get_dgc = _monitor_requests(GET_DGC_REQUESTS)
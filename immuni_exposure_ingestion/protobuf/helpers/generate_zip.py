@@ -11,11 +11,13 @@
 #    You should have received a copy of the GNU Affero General Public License
 #    along with this program. If not, see <https://www.gnu.org/licenses/>.
 
-import base64
 import logging
+from binascii import a2b_base64
 from io import BytesIO
 from zipfile import ZIP_DEFLATED, ZipFile
 
+from google.protobuf.internal import api_implementation
+
 from immuni_common.models.mongoengine.batch_file import BatchFile
 from immuni_exposure_ingestion.core import config
 from immuni_exposure_ingestion.helpers.external_signature import get_external_signature
@@ -23,12 +25,29 @@ from immuni_exposure_ingestion.protobuf.models.schema_v1_pb2 import (
     SignatureInfo,
     TEKSignature,
     TEKSignatureList,
-    TemporaryExposureKey,
     TemporaryExposureKeyExport,
 )
 
 logger = logging.getLogger(__name__)
 
+# The 16 bytes header preceding the protobuf content of every 'export.bin' file.
+_EXPORT_BIN_HEADER_BYTES = config.EXPORT_BIN_HEADER.ljust(16, " ").encode("utf-8")
+
+
+def check_protobuf_implementation() -> None:
+    """
+    Warn if the pure-Python protobuf runtime is in use, rather than the C++ one.
+    The pure-Python runtime is an order of magnitude slower at serializing the repeated keys of
+    large batches. The C++ runtime is selected through PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION.
+    """
+    if (implementation := api_implementation.Type()) == "python":
+        logger.warning(
+            "Using the pure-Python protobuf implementation.",
+            extra=dict(expected_implementation="cpp"),
+        )
+    else:
+        logger.info("Using the %s protobuf implementation.", implementation)
+
 
 def signature_info() -> SignatureInfo:
     """
@@ -45,7 +64,7 @@ def signature_info() -> SignatureInfo:
     )
 
 
-def export_batch_file_to_bin_content(batch_file: BatchFile) -> bytes:
+def export_batch_file_to_bin_content(batch_file: BatchFile, sig_info: SignatureInfo) -> bytes:
     """
     Transform a BatchFile into the binary content for the 'export.bin' file that will be fed to
     the Mobile Client SDK.
@@ -54,46 +73,47 @@ def export_batch_file_to_bin_content(batch_file: BatchFile) -> bytes:
     https://developer.apple.com/documentation/exposurenotification/setting_up_an_exposure_notification_server
 
     :param batch_file: the BatchFile to transform.
+    :param sig_info: the SignatureInfo of the signature to be generated.
     :return: the bytes that will be populate the 'export.bin' file.
     """
-    content = config.EXPORT_BIN_HEADER.ljust(16, " ").encode("utf-8")
-
     # Compose the TEK Export protobuf object.
     export = TemporaryExposureKeyExport(
         start_timestamp=int(batch_file.period_start.timestamp()),
         end_timestamp=int(batch_file.period_end.timestamp()),
         region=config.REGION,
-        signature_infos=[signature_info()],
+        signature_infos=[sig_info],
         batch_num=batch_file.sub_batch_index,
         batch_size=batch_file.sub_batch_count,
-        keys=[
-            TemporaryExposureKey(
-                key_data=base64.b64decode(key.key_data),
-                transmission_risk_level=key.transmission_risk_level.value,
-                rolling_start_interval_number=key.rolling_start_number,
-                rolling_period=key.rolling_period,
-            )
-            for key in batch_file.keys
-        ],
     )
-
-    content += export.SerializeToString()  # Despite the name this serializes in binary, not string.
-    return content
-
-
-def signature_content(bin_content: bytes, batch_file: BatchFile) -> bytes:
+    # Add the keys in place, avoiding the construction of standalone messages to be copied over.
+    # The binascii decoder is what base64.b64decode wraps, without the per-call input coercion.
+    add_key = export.keys.add
+    for key in batch_file.keys:
+        add_key(
+            key_data=a2b_base64(key.key_data),
+            transmission_risk_level=key.transmission_risk_level.value,
+            rolling_start_interval_number=key.rolling_start_number,
+            rolling_period=key.rolling_period,
+        )
+
+    # Despite the name this serializes in binary, not string.
+    return _EXPORT_BIN_HEADER_BYTES + export.SerializeToString()
+
+
+def signature_content(bin_content: bytes, batch_file: BatchFile, sig_info: SignatureInfo) -> bytes:
     """
     Return the protobuf serialization of the signature file, calculated for the given BatchFile.
 
     :param bin_content: the binary content for the 'export.bin' file.
     :param batch_file: the BatchFile for which to compute the protobuf serialization.
+    :param sig_info: the SignatureInfo of the signature, as referenced by the 'export.bin' file.
     :return: the content of the 'export.sig' file.
     """
 
     return TEKSignatureList(
         signatures=[
             TEKSignature(
-                signature_info=signature_info(),
+                signature_info=sig_info,
                 batch_num=batch_file.sub_batch_index,
                 batch_size=batch_file.sub_batch_count,
                 signature=get_external_signature(bin_content),
@@ -106,20 +126,27 @@ def batch_to_sdk_zip_file(batch_file: BatchFile) -> bytes:
     """
     Create the whole zip archive that will be fed to the Mobile Client SDK.
     NOTE: These functions will probably be updated.
+    NOTE: This function is thread-safe, and it is called from executor threads: its heavy lifting
+      (i.e., compression, serialization and the signature request) runs in C or waits on sockets,
+      so it does not hold the GIL for most of its duration.
 
     :param batch_file: the BatchFile from which the zip archive is to be created.
     :return: the zip archive to fed to the Mobile Client SDK.
     """
     archive = BytesIO()
 
-    bin_content = export_batch_file_to_bin_content(batch_file)
+    sig_info = signature_info()
+    bin_content = export_batch_file_to_bin_content(batch_file, sig_info=sig_info)
 
-    with ZipFile(archive, "w", compression=ZIP_DEFLATED) as zip_archive:
+    # The keys are random bytes, hence barely compressible: the fastest level yields the same size.
+    with ZipFile(archive, "w", compression=ZIP_DEFLATED, compresslevel=1) as zip_archive:
         # This is the structure of the zip archive that will be used by the Apple / Google APIs.
         with zip_archive.open("export.bin", "w") as export_file:
             export_file.write(bin_content)
 
         with zip_archive.open("export.sig", "w") as signature_file:
-            signature_file.write(signature_content(bin_content, batch_file=batch_file))
+            signature_file.write(
+                signature_content(bin_content, batch_file=batch_file, sig_info=sig_info)
+            )
 
     return bytes(archive.getbuffer())
@@ -12,6 +12,7 @@
 #    along with this program. If not, see <https://www.gnu.org/licenses/>.
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 
 from immuni_common.models.mongoengine.batch_file import BatchFile
@@ -36,7 +37,10 @@ def delete_old_data() -> None:
     Periodically (default: every day, at midnight) delete data older than DATA_RETENTION_DAYS days
     (default: 14).
 
-    Deleted data comprises (i) Upload and (ii) BatchFile models.
+    Deleted data comprises (i) Upload, (ii) BatchFile, (iii) UploadEu and (iv) BatchFileEu models.
+
+    NOTE: MongoDB TTL indexes are not an option, since these documents carry no date field, and
+      their creation time is derived from their ObjectId instead.
     """
     reference_date = datetime.combine(date.today(), datetime.min.time()) - timedelta(
         days=config.DATA_RETENTION_DAYS
@@ -48,31 +52,31 @@ def delete_old_data() -> None:
             "Some Upload objects were unprocessed until deleted! This should never happen!"
         )
 
-    uploads_deleted = Upload.delete_older_than(reference_date)
+    # Make sure there are no unprocessed uploads in the data about to be deleted.
+    if UploadEu.unprocessed_before(reference_date):
+        _LOGGER.error(
+            "Some Upload from EU objects were unprocessed until deleted! This should never happen!"
+        )
+
+    # The collections are independent, so their deletions are performed concurrently.
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        uploads_deleted, batches_deleted, uploads_eu_deleted, batches_eu_deleted = executor.map(
+            lambda model: model.delete_older_than(reference_date),
+            (Upload, BatchFile, UploadEu, BatchFileEu),
+        )
+
     _LOGGER.info(
         "Upload documents deletion completed.",
         extra=dict(n_deleted=uploads_deleted, created_before=reference_date),
     )
-
-    batches_deleted = BatchFile.delete_older_than(reference_date)
     _LOGGER.info(
         "BatchFile documents deletion completed.",
         extra=dict(n_deleted=batches_deleted, created_before=reference_date),
     )
-
-    # Make sure there are no unprocessed uploads in the data about to be deleted.
-    if UploadEu.unprocessed_before(reference_date):
-        _LOGGER.error(
-            "Some Upload from EU objects were unprocessed until deleted! This should never happen!"
-        )
-
-    uploads_eu_deleted = UploadEu.delete_older_than(reference_date)
     _LOGGER.info(
         "UploadEU documents deletion completed.",
         extra=dict(n_deleted=uploads_eu_deleted, created_before=reference_date),
     )
-
-    batches_eu_deleted = BatchFileEu.delete_older_than(reference_date)
     _LOGGER.info(
         "BatchFileEU documents deletion completed.",
         extra=dict(n_deleted=batches_eu_deleted, created_before=reference_date),
@@ -13,20 +13,19 @@
 
 import asyncio
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import List
 
-from bson import ObjectId
 from croniter import croniter
 
 from immuni_common.models.mongoengine.batch_file import BatchFile
-from immuni_common.models.mongoengine.temporary_exposure_key import TemporaryExposureKey
 from immuni_exposure_ingestion.celery import celery_app
 from immuni_exposure_ingestion.core import config
+from immuni_exposure_ingestion.helpers.batch_file import BatchOutcome, create_batch
 from immuni_exposure_ingestion.helpers.lock import lock_concurrency
 from immuni_exposure_ingestion.helpers.risk_level import (
+    extract_keys_with_highest_risk_level,
     extract_keys_with_risk_level_from_upload,
-    set_highest_risk_level,
 )
 from immuni_exposure_ingestion.models.upload import Upload
 from immuni_exposure_ingestion.models.upload_eu import UploadEu
@@ -37,7 +36,6 @@ from immuni_exposure_ingestion.monitoring.celery import (
     UPLOADS_ENQUEUED,
     UPLOADS_EU_ENQUEUED,
 )
-from immuni_exposure_ingestion.protobuf.helpers.generate_zip import batch_to_sdk_zip_file
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -67,14 +65,35 @@ async def _process_uploads() -> None:
     # Acquire a lock on redis before processing anything, avoiding concurrent tasks.
     async with lock_concurrency("process_uploads"):
         _LOGGER.info("Obtained lock.")
-        _create_batch_it()
-        _create_batch_eu()
+        # The italian and EU batches are built concurrently, since they are dominated by
+        # independent database and compression work. Both of them span the period from the end of
+        # the latest batch until now, and the EU one is completed after the italian one is stored,
+        # so that batch indexes are assigned consecutively.
+        # If the italian batch fails, the EU one is neither stored nor flagged as published.
+        if infos := BatchFile.get_latest_info():
+            last_period, last_index = infos
+        else:
+            last_period = datetime.fromtimestamp(
+                croniter(config.BATCH_PERIODICITY_CRONTAB).get_prev()
+            )
+            last_index = 0
+        now = datetime.utcnow()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            batch_it = executor.submit(_create_batch_it, last_period, last_index, now)
+            batch_eu = executor.submit(_create_batch_eu, last_period, last_index, now, batch_it)
+            results = await asyncio.gather(
+                asyncio.wrap_future(batch_it), asyncio.wrap_future(batch_eu), return_exceptions=True
+            )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
         _LOGGER.info("Releasing lock.")
 
     _LOGGER.info("Upload processing completed successfully.")
 
 
-def _create_batch_it() -> None:
+def _create_batch_it(last_period: datetime, last_index: int, now: datetime) -> BatchOutcome:
     """
     Get the unprocessed uploads from the upload collection, performs some validations and create
     a batch. When the maximum number of keys for a single batch is reached, create the batch,
@@ -84,74 +103,33 @@ def _create_batch_it() -> None:
       generation of multiple batches in a single run of this method.
       This assumption may fall in the future, and we should monitor no queue of
       unprocessed keys will ever get stuck.
-    """
-    _LOGGER.info("Start processing italian TEKs.")
-
-    infos = BatchFile.get_latest_info()
-    now = datetime.utcnow()
 
-    if infos:
-        last_period, last_index = infos
-    else:
-        last_period = datetime.fromtimestamp(croniter(config.BATCH_PERIODICITY_CRONTAB).get_prev())
-        last_index = 0
-
-    period_start = last_period
-    period_end = now
-
-    _LOGGER.info(
-        "Starting to process italian uploads.",
-        extra=dict(period_start=period_start, period_end=period_end),
+    :param last_period: the end of the period of the latest batch.
+    :param last_index: the index of the latest batch.
+    :param now: the end of the period of the batch.
+    :return: the outcome of the creation of the batch.
+    """
+    outcome = create_batch(
+        description="italian",
+        batch_cls=BatchFile,
+        last_period=last_period,
+        last_index=last_index,
+        now=now,
+        uploads=Upload.to_process(),
+        upload_cls=Upload,
+        extract_keys=extract_keys_with_risk_level_from_upload,
     )
-
-    uploads = Upload.to_process()
-
-    _LOGGER.info("Italian uploads have been fetched.", extra=dict(n_uploads=uploads.count()))
-
-    processed_uploads: List[ObjectId] = []
-    keys: List[TemporaryExposureKey] = []
-    for upload in uploads:
-        if (reached := len(keys) + len(upload.keys)) > config.MAX_KEYS_PER_BATCH:
-            _LOGGER.warning(
-                "Early stop: reached maximum number of keys per batch of italian uploads.",
-                extra=dict(pre_reached=len(keys), reached=reached, max=config.MAX_KEYS_PER_BATCH),
-            )
-            break
-        keys += extract_keys_with_risk_level_from_upload(upload)
-        processed_uploads.append(upload.id)
-
-    if (n_keys := len(keys)) > 0:
-        # Sort the keys. This randomizes their order (since they are random strings) so that
-        # keys of the same device are no more likely to end up consecutively.
-        keys = sorted(keys, key=lambda x: x.key_data)
-
-        index = last_index + 1
-
-        batch_file = BatchFile(
-            index=index,
-            keys=keys,
-            period_start=period_start,
-            period_end=period_end,
-            sub_batch_index=1,
-            sub_batch_count=1,
-        )
-        batch_file.client_content = batch_to_sdk_zip_file(batch_file)
-        batch_file.save()
-        _LOGGER.info("Created new italian batch.", extra=dict(index=index, n_keys=n_keys))
+    if outcome.index is not None:
         BATCH_FILES_CREATED.inc()
-        KEYS_PROCESSED.inc(len(keys))
-
-    Upload.set_published(processed_uploads)
-    _LOGGER.info(
-        "Flagged italian uploads as published.",
-        extra=dict(n_processed_uploads=len(processed_uploads)),
-    )
-    UPLOADS_ENQUEUED.set(Upload.to_process().count())
-
-    _LOGGER.info("End processing italian TEKs.")
+        KEYS_PROCESSED.inc(outcome.n_keys)
+    if outcome.n_enqueued is not None:
+        UPLOADS_ENQUEUED.set(outcome.n_enqueued)
+    return outcome
 
 
-def _create_batch_eu() -> None:
+def _create_batch_eu(
+    last_period: datetime, last_index: int, now: datetime, batch_it: Future
+) -> BatchOutcome:
     """
     This method processes the keys of the foreign citizens that have set in their own app "Italy"
     as a country of interest. Get the unprocessed uploads downloaded from the european federation
@@ -164,76 +142,29 @@ def _create_batch_eu() -> None:
       generation of multiple batches in a single run of this method.
       This assumption may fall in the future, and we should monitor no queue of
       unprocessed keys will ever get stuck.
-    """
-    _LOGGER.info("Start processing EU TEKs marked as italian.")
-
-    infos = BatchFile.get_latest_info()
-    now = datetime.utcnow()
-
-    if infos:
-        last_period, last_index = infos
-    else:
-        last_period = datetime.fromtimestamp(croniter(config.BATCH_PERIODICITY_CRONTAB).get_prev())
-        last_index = 0
-
-    period_start = last_period
-    period_end = now
-
-    _LOGGER.info(
-        "Starting to process EU uploads marked as italian.",
-        extra=dict(period_start=period_start, period_end=period_end),
-    )
-
-    uploads = UploadEu.to_process(country_="IT")
 
-    _LOGGER.info(
-        "EU uploads marked as italian have been fetched.", extra=dict(n_uploads=uploads.count())
+    :param last_period: the end of the period of the latest batch.
+    :param last_index: the index of the latest batch.
+    :param now: the end of the period of the batch.
+    :param batch_it: the future of the italian batch, returning its outcome.
+    :return: the outcome of the creation of the batch.
+    """
+    outcome = create_batch(
+        description="EU marked as italian",
+        batch_cls=BatchFile,
+        last_period=last_period,
+        last_index=last_index,
+        now=now,
+        uploads=UploadEu.to_process(country_="IT"),
+        upload_cls=UploadEu,
+        extract_keys=extract_keys_with_highest_risk_level,
+        preceding_batch=batch_it,
+        origin="EU",
+        batch_tag="KEYS_EU",
     )
-
-    processed_uploads: List[ObjectId] = []
-    keys: List[TemporaryExposureKey] = []
-    for upload in uploads:
-        if (reached := len(keys) + len(upload.keys)) > config.MAX_KEYS_PER_BATCH:
-            _LOGGER.warning(
-                "Early stop: reached maximum number of keys "
-                "per batch of EU uploads marked as italian.",
-                extra=dict(pre_reached=len(keys), reached=reached, max=config.MAX_KEYS_PER_BATCH),
-            )
-            break
-        set_highest_risk_level(upload.keys)
-        keys += upload.keys
-        processed_uploads.append(upload.id)
-
-    if (n_keys := len(keys)) > 0:
-        # Sort the keys. This randomizes their order (since they are random strings) so that
-        # keys of the same device are no more likely to end up consecutively.
-        keys = sorted(keys, key=lambda x: x.key_data)
-
-        index = last_index + 1
-
-        batch_file = BatchFile(
-            index=index,
-            keys=keys,
-            period_start=period_start,
-            period_end=period_end,
-            sub_batch_index=1,
-            sub_batch_count=1,
-            origin="EU",
-            batch_tag="KEYS_EU",
-        )
-        batch_file.client_content = batch_to_sdk_zip_file(batch_file)
-        batch_file.save()
-        _LOGGER.info(
-            "Created new UE batch marked as italian.", extra=dict(index=index, n_keys=n_keys)
-        )
+    if outcome.index is not None:
         BATCH_FILES_CREATED.inc()
-        KEYS_EU_PROCESSED.inc(len(keys))
-
-    UploadEu.set_published(processed_uploads)
-    _LOGGER.info(
-        "Flagged EU uploads marked as italian as published.",
-        extra=dict(n_processed_uploads=len(processed_uploads)),
-    )
-    UPLOADS_EU_ENQUEUED.set(Upload.to_process().count())
-
-    _LOGGER.info("End processing EU TEKs marked as italian.")
+        KEYS_EU_PROCESSED.inc(outcome.n_keys)
+    if outcome.n_enqueued is not None:
+        UPLOADS_EU_ENQUEUED.set(outcome.n_enqueued)
+    return outcome
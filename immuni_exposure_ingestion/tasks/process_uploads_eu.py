@@ -14,27 +14,27 @@
 import asyncio
 import logging
 from datetime import datetime
-from typing import List
+from functools import partial
 
-from bson import ObjectId
 from croniter import croniter
 
 from immuni_common.models.mongoengine.batch_file_eu import BatchFileEu
-from immuni_common.models.mongoengine.temporary_exposure_key import TemporaryExposureKey
 from immuni_exposure_ingestion.celery import celery_app
 from immuni_exposure_ingestion.core import config
+from immuni_exposure_ingestion.helpers.batch_file import BatchOutcome, create_batch
 from immuni_exposure_ingestion.helpers.lock import lock_concurrency
-from immuni_exposure_ingestion.helpers.risk_level import set_highest_risk_level
+from immuni_exposure_ingestion.helpers.risk_level import extract_keys_with_highest_risk_level
 from immuni_exposure_ingestion.models.upload_eu import UploadEu
 from immuni_exposure_ingestion.monitoring.celery import (
     BATCH_FILES_EU_CREATED,
     KEYS_EU_PROCESSED,
     UPLOADS_EU_ENQUEUED,
 )
-from immuni_exposure_ingestion.protobuf.helpers.generate_zip import batch_to_sdk_zip_file
 
 _LOGGER = logging.getLogger(__name__)
 
+_MAX_CONCURRENT_COUNTRIES = 8
+
 
 @celery_app.task()
 def process_uploads_eu() -> None:
@@ -61,86 +61,58 @@ async def _process_uploads_eu() -> None:
     # Acquire a lock on redis before processing anything, avoiding concurrent tasks.
     async with lock_concurrency("process_uploads_eu"):
         _LOGGER.info("Obtained lock.")
-        for country in UploadEu.countries_to_process(excluded="IT"):
-            _create_batch(country_=country)
+        # Each country has its own batches, so a bounded number of them is processed concurrently.
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_COUNTRIES)
+
+        async def _create_country_batch(country_: str) -> BatchOutcome:
+            async with semaphore:
+                return await loop.run_in_executor(None, partial(_create_batch, country_=country_))
+
+        results = await asyncio.gather(
+            *(
+                _create_country_batch(country)
+                for country in UploadEu.countries_to_process(excluded="IT")
+            ),
+            return_exceptions=True,
+        )
+        # The metrics are updated once, accounting for all of the successfully processed countries,
+        # since concurrent updates of the gauge would overwrite each other.
+        outcomes = [result for result in results if isinstance(result, BatchOutcome)]
+        BATCH_FILES_EU_CREATED.inc(sum(outcome.index is not None for outcome in outcomes))
+        KEYS_EU_PROCESSED.inc(sum(outcome.n_keys for outcome in outcomes))
+        if n_enqueued := [o.n_enqueued for o in outcomes if o.n_enqueued is not None]:
+            UPLOADS_EU_ENQUEUED.set(sum(n_enqueued))
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
         _LOGGER.info("Releasing lock.")
 
     _LOGGER.info("EU uploads processing completed successfully.")
 
 
-def _create_batch(country_: str) -> None:
+def _create_batch(country_: str) -> BatchOutcome:
     """
     Get the unprocessed upload from the upload_eu collection for the country of interest,
     performs some validations and create multiple batches stored in the batch_file_eu collection.
 
     @param country_: the country of interest
+    :return: the outcome of the creation of the batch.
     """
-    _LOGGER.info("Start processing %s TEKs.", country_)
-
-    infos = BatchFileEu.get_latest_info(country=country_)
-    now = datetime.utcnow()
-
-    if infos:
+    if infos := BatchFileEu.get_latest_info(country=country_):
         last_period, last_index = infos
     else:
         last_period = datetime.fromtimestamp(croniter(config.BATCH_PERIODICITY_CRONTAB).get_prev())
         last_index = 0
 
-    period_start = last_period
-    period_end = now
-
-    _LOGGER.info(
-        "Starting to process %s uploads.",
-        country_,
-        extra=dict(period_start=period_start, period_end=period_end),
+    return create_batch(
+        description=country_,
+        batch_cls=BatchFileEu,
+        last_period=last_period,
+        last_index=last_index,
+        now=datetime.utcnow(),
+        uploads=UploadEu.to_process(country_=country_),
+        upload_cls=UploadEu,
+        extract_keys=extract_keys_with_highest_risk_level,
+        origin=country_,
     )
-
-    uploads = UploadEu.to_process(country_=country_)
-
-    _LOGGER.info("%s uploads have been fetched.", country_, extra=dict(n_uploads=uploads.count()))
-
-    processed_uploads: List[ObjectId] = []
-    keys: List[TemporaryExposureKey] = []
-    for upload in uploads:
-        if (reached := len(keys) + len(upload.keys)) > config.MAX_KEYS_PER_BATCH:
-            _LOGGER.warning(
-                "Early stop: reached maximum number of keys per batch of %s uploads.",
-                country_,
-                extra=dict(pre_reached=len(keys), reached=reached, max=config.MAX_KEYS_PER_BATCH),
-            )
-            break
-        set_highest_risk_level(upload.keys)
-        keys += upload.keys
-        processed_uploads.append(upload.id)
-
-    if (n_keys := len(keys)) > 0:
-        # Sort the keys. This randomizes their order (since they are random strings) so that
-        # keys of the same device are no more likely to end up consecutively.
-        keys = sorted(keys, key=lambda x: x.key_data)
-
-        index = last_index + 1
-
-        batch_file = BatchFileEu(
-            index=index,
-            keys=keys,
-            period_start=period_start,
-            period_end=period_end,
-            sub_batch_index=1,
-            sub_batch_count=1,
-            origin=country_,
-        )
-        batch_file.client_content = batch_to_sdk_zip_file(batch_file)
-        batch_file.save()
-        _LOGGER.info("Created new %s batch.", country_, extra=dict(index=index, n_keys=n_keys))
-        BATCH_FILES_EU_CREATED.inc()
-        KEYS_EU_PROCESSED.inc(len(keys))
-
-    UploadEu.set_published(processed_uploads)
-    _LOGGER.info(
-        "Flagged %s uploads as published.",
-        country_,
-        extra=dict(n_processed_uploads=len(processed_uploads)),
-    )
-    UPLOADS_EU_ENQUEUED.set(UploadEu.to_process(country_=country_).count())
-
-    _LOGGER.info("End processing %s TEKs.", country_)
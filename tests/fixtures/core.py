@@ -13,19 +13,29 @@
 
 from asyncio import AbstractEventLoop
 from contextlib import contextmanager
-from typing import Any, Awaitable, Callable, Iterator
+from hashlib import sha256
+from typing import Any, Awaitable, Callable, Dict, Iterator, Tuple
 
 import pytest
+import responses
 from celery import Celery
 from mongoengine import get_db
+from pymongo import MongoClient
 from pytest import fixture
 from pytest_sanic.utils import TestClient
+from requests import PreparedRequest
 from sanic import Sanic
 
 from immuni_common.helpers.tests import create_no_expired_keys_fixture
 from immuni_exposure_ingestion.core import config
 from immuni_exposure_ingestion.core.managers import managers
 
+# The SHA256 of the code (i.e., OTP or CUN) sent to the mocked external services.
+CODE_SHA256 = sha256(b"59FU36KR46").hexdigest()
+# The SHA256 of the OTP stored by the otp fixture.
+STORED_OTP_SHA256 = sha256(b"12345").hexdigest()
+ID_TEST_VERIFICATION = "2d8af3b9-2c0a-4efc-9e15-72454f994e1f"
+
 
 @contextmanager
 def config_set(name: str, value: Any) -> Iterator[None]:
@@ -37,9 +47,65 @@ def config_set(name: str, value: Any) -> Iterator[None]:
         setattr(config, name, old_value)
 
 
+@contextmanager
+def mock_request(
+    method: str,
+    url: str,
+    callback: Callable[[PreparedRequest], Tuple[int, Dict, str]],
+    **kwargs: Any,
+) -> Iterator[None]:
+    """
+    Register a callback on the session-wide requests mock for the duration of the context.
+    As with responses.RequestsMock, the request is expected to be performed within the context.
+
+    :param method: the HTTP method of the mocked request.
+    :param url: the URL of the mocked request.
+    :param callback: the callback returning the status, headers and body of the response.
+    :param kwargs: the additional arguments of the mocked response (e.g., content_type).
+    """
+    n_calls = 0
+
+    def _callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
+        nonlocal n_calls
+        n_calls += 1
+        return callback(request)
+
+    responses.add_callback(method, url, callback=_callback, **kwargs)
+    try:
+        yield
+    finally:
+        responses.remove(method, url)
+    assert n_calls, f"The mocked request was not performed: {method} {url}"
+
+
+@fixture(scope="session", autouse=True)
+def requests_mock() -> Iterator[None]:
+    # Patching requests once per session is cheaper than entering a RequestsMock in each test.
+    responses.start()
+    yield
+    responses.stop()
+
+
+@fixture(autouse=True)
+def reset_requests_mock() -> Iterator[None]:
+    yield
+    responses.reset()
+
+
+@fixture(scope="session", autouse=True)
+def drop_db() -> Iterator[None]:
+    yield
+    with MongoClient(config.EXPOSURE_MONGO_URL) as client:
+        client.drop_database(client.get_default_database().name)
+
+
 @fixture(autouse=True)
 async def cleanup_db(sanic: Sanic) -> None:
-    managers.exposure_mongo.drop_database(get_db().name)
+    # Emptying the collections keeps their indexes, which would otherwise be rebuilt by each test.
+    db = get_db()
+    for name in db.list_collection_names():
+        if not name.startswith("system."):
+            db[name].delete_many({})
     await managers.otp_redis.flushdb()
     await managers.analytics_redis.flushdb()
 
@@ -21,34 +21,38 @@ import responses
 from requests import PreparedRequest
 
 from immuni_exposure_ingestion.core import config
+from tests.fixtures.core import mock_request
+
+_SIGNATURE_RESPONSE_BODY = json.dumps(
+    dict(signature=base64.b64encode(b"signature").decode("utf-8"))
+)
 
 
 @contextmanager
 def mock_external_response(
     prehash: bool = False, expected_content: Optional[bytes] = None
 ) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                input_payload = sha256(expected_content).digest() if prehash else expected_content
-                assert payload == {
-                    "prehashed": prehash,
-                    "input": base64.b64encode(input_payload).decode("utf-8"),
-                }
-            return (
-                200,
-                {},
-                json.dumps(dict(signature=base64.b64encode(b"signature").decode("utf-8"))),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.SIGNATURE_EXTERNAL_URL}/sign/{config.SIGNATURE_KEY_ALIAS_NAME}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
+    expected_payload = (
+        {
+            "prehashed": prehash,
+            "input": base64.b64encode(
+                sha256(expected_content).digest() if prehash else expected_content
+            ).decode("utf-8"),
+        }
+        if expected_content is not None
+        else None
+    )
+
+    def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
+        assert request.body is not None
+        if expected_payload is not None:
+            assert json.loads(request.body) == expected_payload
+        return (200, {}, _SIGNATURE_RESPONSE_BODY)
+
+    with mock_request(
+        responses.POST,
+        f"https://{config.SIGNATURE_EXTERNAL_URL}/sign/{config.SIGNATURE_KEY_ALIAS_NAME}",
+        callback=request_callback,
+        content_type="application/json",
+    ):
         yield
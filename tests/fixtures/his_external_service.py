@@ -12,628 +12,195 @@
 #    along with this program. If not, see <https://www.gnu.org/licenses/>.
 
 import json
-from contextlib import contextmanager
-from datetime import date
-from hashlib import sha256
-from typing import Dict, Iterator, Optional, Tuple
-from urllib.parse import urlencode
+from typing import ContextManager, Dict, Optional, Tuple
 
 import responses
 from requests import PreparedRequest
 
 from immuni_exposure_ingestion.core import config
+from tests.fixtures.core import CODE_SHA256, ID_TEST_VERIFICATION, mock_request
+
+INVALID_CUN = "b39e0733843b1b5d7"
+
+# The response bodies are serialized once, rather than on every mocked request.
+_VERIFY_SUCCESS_BODY = json.dumps(
+    dict(
+        id_transaction=ID_TEST_VERIFICATION,
+        id_test_verification=ID_TEST_VERIFICATION,
+        date_test="2021-01-10",
+    )
+)
+_VERIFY_MISSING_DICT_VALUES_BODY = json.dumps(
+    dict(id_test_verification=None, id_transaction=ID_TEST_VERIFICATION, date_test=None)
+)
+_VERIFY_MISSING_DICT_KEYS_BODY = json.dumps(dict(id_transaction=ID_TEST_VERIFICATION))
+_RESPONSE_CODE_BODIES = {
+    code: json.dumps(dict(response_code=code, id_transaction=ID_TEST_VERIFICATION))
+    for code in (200, 400, 401, 409, 500)
+}
+
+_DGC_SUCCESS_BODY = json.dumps({"data": {"qrcode": "string"}})
+_DGC_WITH_CBIS_SUCCESS_BODY = json.dumps({"data": {"qrcode": "string", "fglTipoDgc": "string"}})
+_DGC_MISSING_DATA_BODY = json.dumps({"data_": {"qrcode": "string"}})
+_DGC_EMPTY_QRCODE_BODY = json.dumps({"data": {"qrcode": ""}})
+_DGC_BAD_REQUEST_BODY = json.dumps({"data": {"qrcode": "prova", "fglTipoDgc": "string"}})
+
+
+def _mock_his_service(
+    url_setting: str, expected_payload: Optional[Dict[str, str]], status: int, body: str
+) -> ContextManager[None]:
+    def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
+        assert request.body is not None
+        if expected_payload is not None:
+            assert json.loads(request.body) == expected_payload
+        return (status, {}, body)
+
+    return mock_request(
+        responses.POST,
+        f"https://{getattr(config, url_setting)}",
+        callback=request_callback,
+        content_type="application/json",
+    )
+
+
+def _mock_verify_his_service(
+    expected_content: Optional[str], cun: str, status: int, body: str
+) -> ContextManager[None]:
+    return _mock_his_service(
+        "HIS_VERIFY_EXTERNAL_URL",
+        dict(cun=cun, last_his_number="12345678") if expected_content else None,
+        status,
+        body,
+    )
+
+
+def _mock_invalidate_his_service(cun: str, status: int, body: str) -> ContextManager[None]:
+    return _mock_his_service(
+        "HIS_INVALIDATE_EXTERNAL_URL",
+        dict(cun=cun, id_test_verification=ID_TEST_VERIFICATION),
+        status,
+        body,
+    )
+
+
+def mock_external_his_service_success(
+    expected_content: Optional[str] = None,
+) -> ContextManager[None]:
+    # assert is a valid cun and valid last 8 numbers of HIS card.
+    return _mock_verify_his_service(expected_content, CODE_SHA256, 200, _VERIFY_SUCCESS_BODY)
 
 
-@contextmanager
-def mock_external_his_service_success(expected_content: Optional[str] = None) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                # assert is a valid cun and valid last 8 numbers of HIS card.
-                assert payload == {
-                    "cun": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                    "last_his_number": "12345678",
-                }
-            # return 200 as status code.
-            return (
-                200,
-                {},
-                json.dumps(
-                    dict(
-                        id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-                        id_test_verification="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-                        date_test="2021-01-10",
-                    )
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_VERIFY_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
 def mock_external_his_service_schema_validation(
     expected_content: Optional[str] = None,
-) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                # assert is an invalid cun or invalid last 8 numbers of HIS card.
-                assert payload == {
-                    "cun": "b39e0733843b1b5d7",
-                    "last_his_number": "12345678",
-                }
-            # return 400 as status code.
-            return (
-                400,
-                {},
-                json.dumps(
-                    dict(response_code=400, id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f")
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_VERIFY_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
+) -> ContextManager[None]:
+    # assert is an invalid cun or invalid last 8 numbers of HIS card.
+    return _mock_verify_his_service(expected_content, INVALID_CUN, 400, _RESPONSE_CODE_BODIES[400])
+
+
 def mock_external_his_service_unauthorized_otp(
     expected_content: Optional[str] = None,
-) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                # assert the cun is not authorized.
-                assert payload == {
-                    "cun": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                    "last_his_number": "12345678",
-                }
-            # return 401 as status code.
-            return (
-                401,
-                {},
-                json.dumps(
-                    dict(response_code=401, id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f")
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_VERIFY_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
+) -> ContextManager[None]:
+    # assert the cun is not authorized.
+    return _mock_verify_his_service(expected_content, CODE_SHA256, 401, _RESPONSE_CODE_BODIES[401])
+
+
 def mock_external_his_service_otp_collision(
     expected_content: Optional[str] = None,
-) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                # assert cun has been already authorized.
-                assert payload == {
-                    "cun": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                    "last_his_number": "12345678",
-                }
-            # return 409 as status code.
-            return (
-                409,
-                {},
-                json.dumps(
-                    dict(response_code=409, id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f")
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_VERIFY_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
+) -> ContextManager[None]:
+    # assert cun has been already authorized.
+    return _mock_verify_his_service(expected_content, CODE_SHA256, 409, _RESPONSE_CODE_BODIES[409])
+
+
 def mock_external_his_service_api_exception(
     expected_content: Optional[str] = None,
-) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                assert payload == {
-                    "cun": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                    "last_his_number": "12345678",
-                }
-            # return 500 as status code.
-            return (
-                500,
-                {},
-                json.dumps(
-                    dict(response_code=500, id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f")
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_VERIFY_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
+) -> ContextManager[None]:
+    return _mock_verify_his_service(expected_content, CODE_SHA256, 500, _RESPONSE_CODE_BODIES[500])
+
+
 def mock_external_his_service_missing_dict_values(
     expected_content: Optional[str] = None,
-) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                assert payload == {
-                    "cun": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                    "last_his_number": "12345678",
-                }
-            # return 200 as status code, but missing id_test_verification.
-            return (
-                200,
-                {},
-                json.dumps(
-                    dict(
-                        id_test_verification=None,
-                        id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-                        date_test=None,
-                    )
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_VERIFY_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
+) -> ContextManager[None]:
+    # return 200 as status code, but missing id_test_verification.
+    return _mock_verify_his_service(
+        expected_content, CODE_SHA256, 200, _VERIFY_MISSING_DICT_VALUES_BODY
+    )
+
+
 def mock_external_his_service_missing_dict_keys(
     expected_content: Optional[str] = None,
-) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                assert payload == {
-                    "cun": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                    "last_his_number": "12345678",
-                }
-            # return 200 as status code, but missing id_test_verification.
-            return (
-                200,
-                {},
-                json.dumps(dict(id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",)),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_VERIFY_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
-def mock_invalidate_external_his_service_success() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            # assert is an invalid cun or invalid id_test_verification.
-            assert payload == {
-                "cun": "b39e0733843b1b5d7",
-                "id_test_verification": "2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-            }
-            # return 200 as status code.
-            return (
-                200,
-                {},
-                json.dumps(
-                    dict(response_code=200, id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f")
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_INVALIDATE_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
-def mock_invalidate_external_his_service_schema_validation() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            # assert is an invalid cun or invalid id_test_verification.
-            assert payload == {
-                "cun": "b39e0733843b1b5d7",
-                "id_test_verification": "2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-            }
-            # return 400 as status code.
-            return (
-                400,
-                {},
-                json.dumps(
-                    dict(response_code=400, id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f")
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_INVALIDATE_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
-def mock_invalidate_external_his_service_unauthorized_otp() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            # assert the cun is not authorized.
-            assert payload == {
-                "cun": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                "id_test_verification": "2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-            }
-            # return 401 as status code.
-            return (
-                401,
-                {},
-                json.dumps(
-                    dict(response_code=401, id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f")
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_INVALIDATE_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
-def mock_invalidate_external_his_service_otp_collision() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            # assert cun has been already authorized.
-            assert payload == {
-                "cun": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                "id_test_verification": "2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-            }
-            # return 409 as status code.
-            return (
-                409,
-                {},
-                json.dumps(
-                    dict(response_code=409, id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f")
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_INVALIDATE_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
-def mock_invalidate_external_his_service_api_exception() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, Dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            assert payload == {
-                "cun": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                "id_test_verification": "2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-            }
-            # return 500 as status code.
-            return (
-                500,
-                {},
-                json.dumps(
-                    dict(response_code=500, id_transaction="2d8af3b9-2c0a-4efc-9e15-72454f994e1f")
-                ),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.HIS_INVALIDATE_EXTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
-def mock_retrieve_dgc_success() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-        base_url = f"https://{config.DGC_EXTERNAL_URL}"
-        params = dict(
-            mode="ONLY_QRCODE",
-            healthInsuranceCardNumber="14345698",
-            healthInsuranceCardDate=date.today().isoformat(),
-            authCodeSHA256=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-        )
-        url = f"{base_url}?{urlencode(params)}"
-        status_code = 200
-
-        mock_requests.add(
-            responses.GET,
-            url,
-            body=json.dumps({"data": {"qrcode": "string"}}),
-            status=status_code,
-            content_type="application/json",
-            match_querystring=False,
-        )
-
-        yield
-
-
-@contextmanager
-def mock_retrieve_dgc_not_found() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-        base_url = f"https://{config.DGC_EXTERNAL_URL}"
-        params = dict(
-            mode="ONLY_QRCODE",
-            healthInsuranceCardNumber="14345698",
-            healthInsuranceCardDate=date.today().isoformat(),
-            authCodeSHA256=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-        )
-        url = f"{base_url}?{urlencode(params)}"
-        status_code = 404
-
-        mock_requests.add(
-            responses.GET,
-            url,
-            status=status_code,
-            content_type="application/json",
-            match_querystring=False,
-        )
-
-        yield
-
-
-@contextmanager
-def mock_retrieve_dgc_no_authcode_success() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-        base_url = f"https://{config.DGC_EXTERNAL_URL}"
-        params = dict(
-            mode="ONLY_QRCODE",
-            healthInsuranceCardNumber="14345698",
-            healthInsuranceCardDate=date.today().isoformat(),
-            sourceDocumentIDSHA256=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-        )
-        url = f"{base_url}?{urlencode(params)}"
-        status_code = 200
-
-        mock_requests.add(
-            responses.GET,
-            url,
-            body=json.dumps({"data": {"qrcode": "string"}}),
-            status=status_code,
-            content_type="application/json",
-            match_querystring=False,
-        )
-
-        yield
-
-
-@contextmanager
-def mock_retrieve_dgc_api_exception1() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-        base_url = f"https://{config.DGC_EXTERNAL_URL}"
-        params = dict(
-            mode="ONLY_QRCODE",
-            healthInsuranceCardNumber="14345698",
-            healthInsuranceCardDate=date.today().isoformat(),
-            sourceDocumentIDSHA256=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-        )
-        url = f"{base_url}?{urlencode(params)}"
-        status_code = 200
-
-        mock_requests.add(
-            responses.GET,
-            url,
-            body=json.dumps({"data_": {"qrcode": "string"}}),
-            status=status_code,
-            content_type="application/json",
-            match_querystring=False,
-        )
-
-        yield
-
-
-@contextmanager
-def mock_retrieve_dgc_api_exception2() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-        base_url = f"https://{config.DGC_EXTERNAL_URL}"
-        params = dict(
-            mode="ONLY_QRCODE",
-            healthInsuranceCardNumber="14345698",
-            healthInsuranceCardDate=date.today().isoformat(),
-            sourceDocumentIDSHA256=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-        )
-        url = f"{base_url}?{urlencode(params)}"
-        status_code = 500
-
-        mock_requests.add(
-            responses.GET,
-            url,
-            status=status_code,
-            content_type="application/json",
-            match_querystring=False,
-        )
-
-        yield
-
-
-@contextmanager
-def mock_retrieve_dgc_api_exception3() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-        base_url = f"https://{config.DGC_EXTERNAL_URL}"
-        params = dict(
-            mode="ONLY_QRCODE",
-            healthInsuranceCardNumber="14345698",
-            healthInsuranceCardDate=date.today().isoformat(),
-            sourceDocumentIDSHA256=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-        )
-        url = f"{base_url}?{urlencode(params)}"
-        status_code = 200
-
-        mock_requests.add(
-            responses.GET,
-            url,
-            body=json.dumps({"data": {"qrcode": ""}}),
-            status=status_code,
-            content_type="application/json",
-            match_querystring=False,
-        )
-
-        yield
-
-
-@contextmanager
-def mock_retrieve_dgc_api_exception4() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-        base_url = f"https://{config.DGC_EXTERNAL_URL}"
-        params = dict(
-            mode="ONLY_QRCODE",
-            healthInsuranceCardNumber="14345698",
-            healthInsuranceCardDate=date.today().isoformat(),
-            sourceDocumentIDSHA256=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-        )
-        url = f"{base_url}?{urlencode(params)}"
-        status_code = 400
-
-        mock_requests.add(
-            responses.GET,
-            url,
-            body=json.dumps({"data": {"qrcode": "prova", "fglTipoDgc": "string"}}),
-            status=status_code,
-            content_type="application/json",
-            match_querystring=False,
-        )
-
-        yield
-
-
-@contextmanager
-def mock_retrieve_dgc_with_cbis_success() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-        base_url = f"https://{config.DGC_EXTERNAL_URL}"
-        params = dict(
-            mode="ONLY_QRCODE",
-            healthInsuranceCardNumber="14345698",
-            healthInsuranceCardDate=date.today().isoformat(),
-            authCodeSHA256=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-        )
-        url = f"{base_url}?{urlencode(params)}"
-        status_code = 200
-
-        mock_requests.add(
-            responses.GET,
-            url,
-            body=json.dumps({"data": {"qrcode": "string", "fglTipoDgc": "string"}}),
-            status=status_code,
-            content_type="application/json",
-            match_querystring=False,
-        )
-
-        yield
-
-
-@contextmanager
-def mock_retrieve_dgc_with_cbis_not_found() -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-        base_url = f"https://{config.DGC_EXTERNAL_URL}"
-        params = dict(
-            mode="ONLY_QRCODE",
-            healthInsuranceCardNumber="14345698",
-            healthInsuranceCardDate=date.today().isoformat(),
-            authCodeSHA256=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-        )
-        url = f"{base_url}?{urlencode(params)}"
-        status_code = 404
-
-        mock_requests.add(
-            responses.GET,
-            url,
-            status=status_code,
-            content_type="application/json",
-            match_querystring=False,
-        )
-
-        yield
+) -> ContextManager[None]:
+    # return 200 as status code, but missing id_test_verification.
+    return _mock_verify_his_service(
+        expected_content, CODE_SHA256, 200, _VERIFY_MISSING_DICT_KEYS_BODY
+    )
+
+
+def mock_invalidate_external_his_service_success() -> ContextManager[None]:
+    # assert is an invalid cun or invalid id_test_verification.
+    return _mock_invalidate_his_service(INVALID_CUN, 200, _RESPONSE_CODE_BODIES[200])
+
+
+def mock_invalidate_external_his_service_schema_validation() -> ContextManager[None]:
+    # assert is an invalid cun or invalid id_test_verification.
+    return _mock_invalidate_his_service(INVALID_CUN, 400, _RESPONSE_CODE_BODIES[400])
+
+
+def mock_invalidate_external_his_service_unauthorized_otp() -> ContextManager[None]:
+    # assert the cun is not authorized.
+    return _mock_invalidate_his_service(CODE_SHA256, 401, _RESPONSE_CODE_BODIES[401])
+
+
+def mock_invalidate_external_his_service_otp_collision() -> ContextManager[None]:
+    # assert cun has been already authorized.
+    return _mock_invalidate_his_service(CODE_SHA256, 409, _RESPONSE_CODE_BODIES[409])
+
+
+def mock_invalidate_external_his_service_api_exception() -> ContextManager[None]:
+    return _mock_invalidate_his_service(CODE_SHA256, 500, _RESPONSE_CODE_BODIES[500])
+
+
+def _mock_dgc_service(status: int, body: str = "") -> ContextManager[None]:
+    # The query string is not matched, hence only the base URL is needed.
+    return mock_request(
+        responses.GET,
+        f"https://{config.DGC_EXTERNAL_URL}",
+        callback=lambda _: (status, {}, body),
+        content_type="application/json",
+        match_querystring=False,
+    )
+
+
+def mock_retrieve_dgc_success() -> ContextManager[None]:
+    return _mock_dgc_service(200, _DGC_SUCCESS_BODY)
+
+
+def mock_retrieve_dgc_not_found() -> ContextManager[None]:
+    return _mock_dgc_service(404)
+
+
+def mock_retrieve_dgc_no_authcode_success() -> ContextManager[None]:
+    return _mock_dgc_service(200, _DGC_SUCCESS_BODY)
+
+
+def mock_retrieve_dgc_api_exception1() -> ContextManager[None]:
+    return _mock_dgc_service(200, _DGC_MISSING_DATA_BODY)
+
+
+def mock_retrieve_dgc_api_exception2() -> ContextManager[None]:
+    return _mock_dgc_service(500)
+
+
+def mock_retrieve_dgc_api_exception3() -> ContextManager[None]:
+    return _mock_dgc_service(200, _DGC_EMPTY_QRCODE_BODY)
+
+
+def mock_retrieve_dgc_api_exception4() -> ContextManager[None]:
+    return _mock_dgc_service(400, _DGC_BAD_REQUEST_BODY)
+
+
+def mock_retrieve_dgc_with_cbis_success() -> ContextManager[None]:
+    return _mock_dgc_service(200, _DGC_WITH_CBIS_SUCCESS_BODY)
+
+
+def mock_retrieve_dgc_with_cbis_not_found() -> ContextManager[None]:
+    return _mock_dgc_service(404)
@@ -12,7 +12,6 @@
 #    along with this program. If not, see <https://www.gnu.org/licenses/>.
 
 from datetime import date
-from hashlib import sha256
 
 import pytest
 
@@ -20,6 +19,10 @@ from immuni_common.helpers.otp import key_for_otp_sha
 from immuni_common.models.dataclasses import OtpData
 from immuni_common.models.marshmallow.schemas import OtpDataSchema
 from immuni_exposure_ingestion.core.managers import managers
+from tests.fixtures.core import STORED_OTP_SHA256
+
+_OTP_KEY = key_for_otp_sha(STORED_OTP_SHA256)
+_OTP_DATA_SCHEMA = OtpDataSchema()
 
 
 @pytest.fixture()
@@ -27,7 +30,5 @@ async def otp() -> OtpData:
     # Key is 12345
     otp = OtpData(id_test_verification=None, symptoms_started_on=date.today())
     # Authorize this otp
-    await managers.otp_redis.set(
-        key_for_otp_sha(sha256("12345".encode("utf-8")).hexdigest()), OtpDataSchema().dumps(otp),
-    )
+    await managers.otp_redis.set(_OTP_KEY, _OTP_DATA_SCHEMA.dumps(otp))
     return otp
@@ -12,133 +12,58 @@
 #    along with this program. If not, see <https://www.gnu.org/licenses/>.
 
 import json
-from contextlib import contextmanager
 from datetime import date
 from hashlib import sha256
-from typing import Iterator, Tuple
+from typing import ContextManager, Tuple
 
 import responses
 from requests import PreparedRequest
 
 from immuni_exposure_ingestion.core import config
+from tests.fixtures.core import CODE_SHA256, ID_TEST_VERIFICATION, mock_request
 
+INVALID_OTP_SHA256 = sha256(b"59FU").hexdigest()
+_EMPTY_BODY = json.dumps(dict())
 
-@contextmanager
-def mock_internal_otp_service_success(expected_content: bool) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                # assert is valid payload
-                assert payload == {
-                    "otp": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                    "symptoms_started_on": date.today().isoformat(),
-                    "id_test_verification": "2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-                }
-            # return 204 as status code.
-            return (
-                204,
-                {},
-                json.dumps(dict()),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.OTP_INTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
-def mock_internal_otp_service_schema_validation(expected_content: bool) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                assert payload == {
-                    "otp": sha256("59FU".encode("utf-8")).hexdigest(),
-                    "symptoms_started_on": date.today().isoformat(),
-                    "id_test_verification": "2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-                }
-            # return 400 as status code.
-            return (
-                400,
-                {},
-                json.dumps(dict()),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.OTP_INTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
-def mock_internal_otp_service_otp_collision(expected_content: bool) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                assert payload == {
-                    "otp": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                    "symptoms_started_on": date.today().isoformat(),
-                    "id_test_verification": "2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-                }
-            # return 409 as status code.
-            return (
-                409,
-                {},
-                json.dumps(dict()),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.OTP_INTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
-
-
-@contextmanager
-def mock_internal_otp_service_api_exception(expected_content: bool) -> Iterator[None]:
-    with responses.RequestsMock() as mock_requests:
-
-        def request_callback(request: PreparedRequest) -> Tuple[int, dict, str]:
-            assert request.body is not None
-            payload = json.loads(request.body)
-            if expected_content:
-                assert payload == {
-                    "otp": sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                    "symptoms_started_on": date.today().isoformat(),
-                    "id_test_verification": "2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-                }
-            # return 500 as status code.
-            return (
-                500,
-                {},
-                json.dumps(dict()),
-            )
-
-        mock_requests.add_callback(
-            responses.POST,
-            f"https://{config.OTP_INTERNAL_URL}",
-            callback=request_callback,
-            content_type="application/json",
-        )
-
-        yield
+
+def _mock_internal_otp_service(
+    expected_content: bool, otp_sha: str, status: int
+) -> ContextManager[None]:
+    expected_payload = {
+        "otp": otp_sha,
+        "symptoms_started_on": date.today().isoformat(),
+        "id_test_verification": ID_TEST_VERIFICATION,
+    }
+
+    def request_callback(request: PreparedRequest) -> Tuple[int, dict, str]:
+        assert request.body is not None
+        if expected_content:
+            assert json.loads(request.body) == expected_payload
+        return (status, {}, _EMPTY_BODY)
+
+    return mock_request(
+        responses.POST,
+        f"https://{config.OTP_INTERNAL_URL}",
+        callback=request_callback,
+        content_type="application/json",
+    )
+
+
+def mock_internal_otp_service_success(expected_content: bool) -> ContextManager[None]:
+    # assert is valid payload, return 204 as status code.
+    return _mock_internal_otp_service(expected_content, CODE_SHA256, 204)
+
+
+def mock_internal_otp_service_schema_validation(expected_content: bool) -> ContextManager[None]:
+    # return 400 as status code.
+    return _mock_internal_otp_service(expected_content, INVALID_OTP_SHA256, 400)
+
+
+def mock_internal_otp_service_otp_collision(expected_content: bool) -> ContextManager[None]:
+    # return 409 as status code.
+    return _mock_internal_otp_service(expected_content, CODE_SHA256, 409)
+
+
+def mock_internal_otp_service_api_exception(expected_content: bool) -> ContextManager[None]:
+    # return 500 as status code.
+    return _mock_internal_otp_service(expected_content, CODE_SHA256, 500)
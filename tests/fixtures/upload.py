@@ -11,39 +11,58 @@
 #    You should have received a copy of the GNU Affero General Public License
 #    along with this program. If not, see <https://www.gnu.org/licenses/>.
 
-import base64
-import random
-from datetime import date, datetime, timedelta
-from typing import Iterable
+import os
+from binascii import b2a_base64
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
 
-from freezegun import freeze_time
+from bson import ObjectId
 
 from immuni_common.models.mongoengine.temporary_exposure_key import TemporaryExposureKey
 from immuni_exposure_ingestion.core import config
 from immuni_exposure_ingestion.models.upload import Upload
 from immuni_exposure_ingestion.models.upload_eu import UploadEu
 
+_KEY_DATA_SIZE_BYTES = 16
 
-def generate_random_key_data(size_bytes: int = 16) -> str:
-    return base64.b64encode(
-        bytes(bytearray(random.getrandbits(8) for _ in range(size_bytes)))
-    ).decode("utf-8")
 
+def generate_random_key_data(size_bytes: int = _KEY_DATA_SIZE_BYTES) -> str:
+    return b2a_base64(os.urandom(size_bytes), newline=False).decode("ascii")
 
-def generate_batch_of_keys(n: int = 14) -> Iterable[TemporaryExposureKey]:
+
+def generate_object_id(datetime_: datetime) -> ObjectId:
+    """
+    Returns a unique ObjectId, as if it was generated at the given datetime.
+    """
+    return ObjectId(ObjectId.from_datetime(datetime_).binary[:4] + ObjectId().binary[4:])
+
+
+def generate_batch_of_keys(
+    n: int = 14, now: Optional[datetime] = None
+) -> Iterable[TemporaryExposureKey]:
     """
     Returns a list of temporary exposure keys, one per day starting from now.
     :param n:
+    :param now: the datetime to consider as now, if other than the current one.
     :return:
     """
-    starting_date = datetime.utcnow() - timedelta(days=n - 1)
+    # Naive datetimes are in UTC, whatever the local timezone.
+    starting_date = ((now or datetime.utcnow()) - timedelta(days=n - 1)).replace(
+        tzinfo=timezone.utc
+    )
+    n_keys = config.MAX_KEYS_PER_UPLOAD
+    # The random data of all of the keys is generated at once, then split.
+    key_data = os.urandom(n_keys * _KEY_DATA_SIZE_BYTES)
     return [
         TemporaryExposureKey(
-            key_data=generate_random_key_data(),
+            key_data=b2a_base64(
+                key_data[day * _KEY_DATA_SIZE_BYTES : (day + 1) * _KEY_DATA_SIZE_BYTES],
+                newline=False,
+            ).decode("ascii"),
             rolling_start_number=int((starting_date + timedelta(days=day)).timestamp() / 600),
             rolling_period=144,
         )
-        for day in range(config.MAX_KEYS_PER_UPLOAD)
+        for day in range(n_keys)
     ]
 
 
@@ -57,14 +76,20 @@ def generate_random_uploads(n: int, *, start_time: datetime, end_time: datetime)
     including today's key, we get 10 keys.
     """
     interval = timedelta(seconds=(end_time - start_time).total_seconds() / n)
-    with freeze_time(start_time) as time:
-        for i in range(n):
+    # The creation time is set through the ids, rather than freezing and ticking the clock.
+    created_ats = [start_time + i * interval for i in range(n)]
+    Upload.objects.insert(
+        [
             Upload(
+                id=generate_object_id(created_at),
                 to_publish=True,
-                keys=generate_batch_of_keys(),
-                symptoms_started_on=date.today() - timedelta(days=7),
-            ).save()
-            time.tick(interval)
+                keys=generate_batch_of_keys(now=created_at),
+                symptoms_started_on=created_at.date() - timedelta(days=7),
+            )
+            for created_at in created_ats
+        ],
+        load_bulk=False,
+    )
 
 
 def generate_random_uploads_eu(n: int, *, start_time: datetime, end_time: datetime) -> None:
@@ -77,12 +102,20 @@ def generate_random_uploads_eu(n: int, *, start_time: datetime, end_time: dateti
     including today's key, we get 10 keys.
     """
     interval = timedelta(seconds=(end_time - start_time).total_seconds() / n)
-    with freeze_time(start_time) as time:
-        for i in range(n):
+    created_ats = [start_time + i * interval for i in range(n)]
+    UploadEu.objects.insert(
+        [
             UploadEu(
-                to_publish=True, keys=generate_batch_of_keys(), country="DK", origin="PL",
-            ).save()
-            time.tick(interval)
+                id=generate_object_id(created_at),
+                to_publish=True,
+                keys=generate_batch_of_keys(now=created_at),
+                country="DK",
+                origin="PL",
+            )
+            for created_at in created_ats
+        ],
+        load_bulk=False,
+    )
 
 
 # generate uploads coming from European federation gateway service to be sent to Italian users
@@ -96,9 +129,17 @@ def generate_random_uploads_eu_to_it(n: int, *, start_time: datetime, end_time:
     including today's key, we get 10 keys.
     """
     interval = timedelta(seconds=(end_time - start_time).total_seconds() / n)
-    with freeze_time(start_time) as time:
-        for i in range(n):
+    created_ats = [start_time + i * interval for i in range(n)]
+    UploadEu.objects.insert(
+        [
             UploadEu(
-                to_publish=True, keys=generate_batch_of_keys(), country="IT", origin="DE",
-            ).save()
-            time.tick(interval)
+                id=generate_object_id(created_at),
+                to_publish=True,
+                keys=generate_batch_of_keys(now=created_at),
+                country="IT",
+                origin="DE",
+            )
+            for created_at in created_ats
+        ],
+        load_bulk=False,
+    )
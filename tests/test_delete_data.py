@@ -15,7 +15,6 @@ from datetime import datetime, timedelta
 
 from bson import ObjectId
 from celery import Celery
-from freezegun import freeze_time
 
 from immuni_common.helpers.tests import mock_config
 from immuni_common.models.mongoengine.batch_file import BatchFile
@@ -24,40 +23,70 @@ from immuni_common.models.mongoengine.temporary_exposure_key import TemporaryExp
 from immuni_exposure_ingestion.core import config
 from immuni_exposure_ingestion.models.upload import Upload
 from immuni_exposure_ingestion.models.upload_eu import UploadEu
-from tests.fixtures.upload import generate_random_uploads_eu
-from tests.test_process_uploads import generate_random_uploads
+from tests.fixtures.upload import generate_batch_of_keys, generate_object_id
 
 
 async def generate_various_data(num_days: int) -> None:
     starting_date = datetime.utcnow() - timedelta(days=num_days)
-    for i in range(num_days):
-        with freeze_time(starting_date + timedelta(days=i)):
-            generate_random_uploads(
-                1, start_time=datetime.utcnow(), end_time=datetime.utcnow() + timedelta(days=1),
+    created_ats = [starting_date + timedelta(days=i) for i in range(num_days)]
+    Upload.objects.insert(
+        [
+            Upload(
+                id=generate_object_id(created_at),
+                to_publish=True,
+                keys=generate_batch_of_keys(now=created_at),
+                symptoms_started_on=created_at.date() - timedelta(days=7),
             )
+            for created_at in created_ats
+        ],
+        load_bulk=False,
+    )
+    BatchFile.objects.insert(
+        [
             BatchFile(
+                id=generate_object_id(created_at),
                 index=i,
                 keys=[TemporaryExposureKey(key_data="dummy_data", rolling_start_number=12345)],
-                period_start=datetime.today() - timedelta(days=1),
-                period_end=datetime.today(),
+                period_start=created_at - timedelta(days=1),
+                period_end=created_at,
                 origin="IT",
-            ).save()
+            )
+            for i, created_at in enumerate(created_ats)
+        ],
+        load_bulk=False,
+    )
 
 
 async def generate_various_data_eu(num_days: int) -> None:
     starting_date = datetime.utcnow() - timedelta(days=num_days)
-    for i in range(num_days):
-        with freeze_time(starting_date + timedelta(days=i)):
-            generate_random_uploads_eu(
-                1, start_time=datetime.utcnow(), end_time=datetime.utcnow() + timedelta(days=1),
+    created_ats = [starting_date + timedelta(days=i) for i in range(num_days)]
+    UploadEu.objects.insert(
+        [
+            UploadEu(
+                id=generate_object_id(created_at),
+                to_publish=True,
+                keys=generate_batch_of_keys(now=created_at),
+                country="DK",
+                origin="PL",
             )
+            for created_at in created_ats
+        ],
+        load_bulk=False,
+    )
+    BatchFileEu.objects.insert(
+        [
             BatchFileEu(
+                id=generate_object_id(created_at),
                 index=i,
                 keys=[TemporaryExposureKey(key_data="dummy_data", rolling_start_number=12345)],
-                period_start=datetime.today() - timedelta(days=1),
-                period_end=datetime.today(),
+                period_start=created_at - timedelta(days=1),
+                period_end=created_at,
                 origin="DK",
-            ).save()
+            )
+            for i, created_at in enumerate(created_ats)
+        ],
+        load_bulk=False,
+    )
 
 
 @mock_config(config, "DATA_RETENTION_DAYS", 14)
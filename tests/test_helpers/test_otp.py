@@ -25,27 +25,23 @@ from immuni_exposure_ingestion.helpers.api import validate_otp_token
 
 _OTP = generate_otp()
 _OTP_SHA = sha256(_OTP.encode("utf-8")).hexdigest()
+_OTP_KEY = key_for_otp_sha(_OTP_SHA)
 _SYMPTOMS_STARTED_ON = date.today() - timedelta(days=30)
+_OTP_DATA = json.dumps({"symptoms_started_on": _SYMPTOMS_STARTED_ON.isoformat()})
 
 
 async def test_load_success() -> None:
-    key = key_for_otp_sha(_OTP_SHA)
-    await managers.otp_redis.set(
-        key=key, value=json.dumps({"symptoms_started_on": _SYMPTOMS_STARTED_ON.isoformat()})
-    )
+    await managers.otp_redis.set(key=_OTP_KEY, value=_OTP_DATA)
     actual = await validate_otp_token(otp_sha=_OTP_SHA)
     assert actual.symptoms_started_on == _SYMPTOMS_STARTED_ON
 
 
 async def test_load_success_and_delete() -> None:
-    key = key_for_otp_sha(_OTP_SHA)
-    await managers.otp_redis.set(
-        key=key, value=json.dumps({"symptoms_started_on": _SYMPTOMS_STARTED_ON.isoformat()})
-    )
+    await managers.otp_redis.set(key=_OTP_KEY, value=_OTP_DATA)
     actual = await validate_otp_token(otp_sha=_OTP_SHA, delete=True)
     assert actual.symptoms_started_on == _SYMPTOMS_STARTED_ON
 
-    assert await managers.otp_redis.get(key=key) is None
+    assert await managers.otp_redis.get(key=_OTP_KEY) is None
 
 
 async def test_load_failure() -> None:
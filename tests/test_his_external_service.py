@@ -11,7 +11,9 @@
 #    You should have received a copy of the GNU Affero General Public License
 #    along with this program. If not, see <https://www.gnu.org/licenses/>.
 from datetime import date
-from hashlib import sha256
+from typing import Callable, ContextManager, Iterator, Type
+
+import pytest
 
 from immuni_common.core.exceptions import (
     ApiException,
@@ -25,8 +27,9 @@ from immuni_exposure_ingestion.helpers.his_external_service import (
     retrieve_dgc,
     verify_cun,
 )
-from tests.fixtures.core import config_set
+from tests.fixtures.core import CODE_SHA256, ID_TEST_VERIFICATION, config_set
 from tests.fixtures.his_external_service import (
+    INVALID_CUN,
     mock_external_his_service_api_exception,
     mock_external_his_service_missing_dict_keys,
     mock_external_his_service_missing_dict_values,
@@ -50,268 +53,115 @@ from tests.fixtures.his_external_service import (
     mock_retrieve_dgc_with_cbis_not_found,
 )
 
-
-def test_his_external_service() -> None:
-    with config_set("HIS_VERIFY_EXTERNAL_URL", "example.com"), mock_external_his_service_success(
-        expected_content="2d8af3b9-2c0a-4efc-9e15-72454f994e1f"
-    ):
-        json_response = verify_cun(
-            cun_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(), last_his_number="12345678"
-        )
-        assert json_response
-
-
-def test_his_external_service_schema_validation() -> None:
-    with config_set(
-        "HIS_VERIFY_EXTERNAL_URL", "example.com"
-    ), mock_external_his_service_schema_validation(
-        expected_content="2d8af3b9-2c0a-4efc-9e15-72454f994e1f"
-    ):
-        try:
-            verify_cun(cun_sha="b39e0733843b1b5d7", last_his_number="12345678")
-        except SchemaValidationException as e:
-            assert e
-
-
-def test_his_external_service_unauthorized_otp() -> None:
-    with config_set(
-        "HIS_VERIFY_EXTERNAL_URL", "example.com"
-    ), mock_external_his_service_unauthorized_otp(
-        expected_content="2d8af3b9-2c0a-4efc-9e15-72454f994e1f"
-    ):
-        try:
-            verify_cun(
-                cun_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(), last_his_number="12345678"
-            )
-        except UnauthorizedOtpException as e:
-            assert e
-
-
-def test_his_external_service_otp_collision() -> None:
-    with config_set(
-        "HIS_VERIFY_EXTERNAL_URL", "example.com"
-    ), mock_external_his_service_otp_collision(
-        expected_content="2d8af3b9-2c0a-4efc-9e15-72454f994e1f"
-    ):
-        try:
-            verify_cun(
-                cun_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(), last_his_number="12345678"
-            )
-        except OtpCollisionException as e:
-            assert e
+_HIS_EXPIRING_DATE = date.today()
 
 
-def test_his_external_service_api_exception() -> None:
-    with config_set(
-        "HIS_VERIFY_EXTERNAL_URL", "example.com"
-    ), mock_external_his_service_api_exception(
-        expected_content="2d8af3b9-2c0a-4efc-9e15-72454f994e1f"
-    ):
-        try:
-            verify_cun(
-                cun_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(), last_his_number="12345678"
-            )
-        except ApiException as e:
-            assert e
+@pytest.fixture(scope="module", autouse=True)
+def external_urls() -> Iterator[None]:
+    with config_set("HIS_VERIFY_EXTERNAL_URL", "example.com"), config_set(
+        "HIS_INVALIDATE_EXTERNAL_URL", "example.com"
+    ), config_set("DGC_EXTERNAL_URL", "example.com"):
+        yield
 
 
-def test_his_external_service_missing_dict_values() -> None:
-    with config_set(
-        "HIS_VERIFY_EXTERNAL_URL", "example.com"
-    ), mock_external_his_service_missing_dict_values(
-        expected_content="2d8af3b9-2c0a-4efc-9e15-72454f994e1f"
-    ):
-        try:
-            verify_cun(
-                cun_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(), last_his_number="12345678"
-            )
-        except UnauthorizedOtpException as e:
-            assert e
+def test_his_external_service() -> None:
+    with mock_external_his_service_success(expected_content=ID_TEST_VERIFICATION):
+        json_response = verify_cun(cun_sha=CODE_SHA256, last_his_number="12345678")
+        assert json_response
 
 
-def test_his_external_service_missing_dict_keys() -> None:
-    with config_set(
-        "HIS_VERIFY_EXTERNAL_URL", "example.com"
-    ), mock_external_his_service_missing_dict_keys(
-        expected_content="2d8af3b9-2c0a-4efc-9e15-72454f994e1f"
-    ):
-        try:
-            verify_cun(
-                cun_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(), last_his_number="12345678"
-            )
-        except UnauthorizedOtpException as e:
-            assert e
+@pytest.mark.parametrize(
+    "mock_his_service,cun_sha,exception",
+    [
+        (mock_external_his_service_schema_validation, INVALID_CUN, SchemaValidationException),
+        (mock_external_his_service_unauthorized_otp, CODE_SHA256, UnauthorizedOtpException),
+        (mock_external_his_service_otp_collision, CODE_SHA256, OtpCollisionException),
+        (mock_external_his_service_api_exception, CODE_SHA256, ApiException),
+        (mock_external_his_service_missing_dict_values, CODE_SHA256, UnauthorizedOtpException),
+        (mock_external_his_service_missing_dict_keys, CODE_SHA256, UnauthorizedOtpException),
+    ],
+)
+def test_his_external_service_exceptions(
+    mock_his_service: Callable[..., ContextManager[None]], cun_sha: str, exception: Type[Exception]
+) -> None:
+    with mock_his_service(expected_content=ID_TEST_VERIFICATION):
+        with pytest.raises(exception):
+            verify_cun(cun_sha=cun_sha, last_his_number="12345678")
 
 
 def test_invalidate_his_external_service_success() -> None:
-    with config_set(
-        "HIS_INVALIDATE_EXTERNAL_URL", "example.com"
-    ), mock_invalidate_external_his_service_success():
-        response = invalidate_cun(
-            cun_sha="b39e0733843b1b5d7",
-            id_test_verification="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-        )
+    with mock_invalidate_external_his_service_success():
+        response = invalidate_cun(cun_sha=INVALID_CUN, id_test_verification=ID_TEST_VERIFICATION)
         assert response is True
 
 
-def test_invalidate_his_external_service_schema_validation() -> None:
-    with config_set(
-        "HIS_INVALIDATE_EXTERNAL_URL", "example.com"
-    ), mock_invalidate_external_his_service_schema_validation():
-        try:
-            invalidate_cun(
-                cun_sha="b39e0733843b1b5d7",
-                id_test_verification="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-            )
-        except SchemaValidationException as e:
-            assert e
-
-
-def test_invalidate_his_external_service_unauthorized_otp() -> None:
-    with config_set(
-        "HIS_INVALIDATE_EXTERNAL_URL", "example.com"
-    ), mock_invalidate_external_his_service_unauthorized_otp():
-        try:
-            invalidate_cun(
-                cun_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                id_test_verification="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-            )
-        except UnauthorizedOtpException as e:
-            assert e
-
-
-def test_invalidate_his_external_service_otp_collision() -> None:
-    with config_set(
-        "HIS_INVALIDATE_EXTERNAL_URL", "example.com"
-    ), mock_invalidate_external_his_service_otp_collision():
-        try:
-            invalidate_cun(
-                cun_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                id_test_verification="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-            )
-        except OtpCollisionException as e:
-            assert e
-
-
-def test_invalidate_his_external_service_api_exception() -> None:
-    with config_set(
-        "HIS_INVALIDATE_EXTERNAL_URL", "example.com"
-    ), mock_invalidate_external_his_service_api_exception():
-        try:
-            invalidate_cun(
-                cun_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                id_test_verification="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
-            )
-        except ApiException as e:
-            assert e
-
-
-def test_retrieve_dgc_success() -> None:
-    with config_set("DGC_EXTERNAL_URL", "example.com"), mock_retrieve_dgc_success():
-        response = retrieve_dgc(
-            token_code_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-            last_his_number="12345678",
-            his_expiring_date=date.today(),
-            token_type="authcode",
-        )
-        assert response
-
-
-def test_retrieve_dgc_no_authcode_success() -> None:
-    with config_set("DGC_EXTERNAL_URL", "example.com"), mock_retrieve_dgc_no_authcode_success():
-        response = retrieve_dgc(
-            token_code_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-            last_his_number="12345678",
-            his_expiring_date=date.today(),
-            token_type="nucg",
-        )
-        assert response
-
-
-def test_retrieve_no_dgc_exception() -> None:
-    with config_set("DGC_EXTERNAL_URL", "example.com"), mock_retrieve_dgc_not_found():
-        try:
-            retrieve_dgc(
-                token_code_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                last_his_number="12345678",
-                his_expiring_date=date.today(),
-                token_type="authcode",
-            )
-        except DgcNotFoundException as e:
-            assert e
-
-
-def test_retrieve_api_exception1() -> None:
-    with config_set("DGC_EXTERNAL_URL", "example.com"), mock_retrieve_dgc_api_exception1():
-        try:
-            retrieve_dgc(
-                token_code_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                last_his_number="12345678",
-                his_expiring_date=date.today(),
-                token_type="cun",
-            )
-        except ApiException as e:
-            assert e
-
-
-def test_retrieve_api_exception2() -> None:
-    with config_set("DGC_EXTERNAL_URL", "example.com"), mock_retrieve_dgc_api_exception2():
-        try:
-            retrieve_dgc(
-                token_code_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                last_his_number="12345678",
-                his_expiring_date=date.today(),
-                token_type="nrfe",
-            )
-        except ApiException as e:
-            assert e
-
-
-def test_retrieve_api_exception3() -> None:
-    with config_set("DGC_EXTERNAL_URL", "example.com"), mock_retrieve_dgc_api_exception3():
-        try:
-            retrieve_dgc(
-                token_code_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                last_his_number="12345678",
-                his_expiring_date=date.today(),
-                token_type="authcode",
-            )
-        except ApiException as e:
-            assert e
-
-
-def test_retrieve_api_exception4() -> None:
-    with config_set("DGC_EXTERNAL_URL", "example.com"), mock_retrieve_dgc_api_exception4():
-        try:
-            retrieve_dgc(
-                token_code_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
-                last_his_number="12345678",
-                his_expiring_date=date.today(),
-                token_type="authcode",
-            )
-        except ApiException as e:
-            assert e
-
-
-def test_retrieve_dgc_with_cbis_success() -> None:
-    with config_set("DGC_EXTERNAL_URL", "example.com"), mock_retrieve_dgc_with_cbis_success():
+@pytest.mark.parametrize(
+    "mock_his_service,cun_sha,exception",
+    [
+        (
+            mock_invalidate_external_his_service_schema_validation,
+            INVALID_CUN,
+            SchemaValidationException,
+        ),
+        (
+            mock_invalidate_external_his_service_unauthorized_otp,
+            CODE_SHA256,
+            UnauthorizedOtpException,
+        ),
+        (mock_invalidate_external_his_service_otp_collision, CODE_SHA256, OtpCollisionException),
+        (mock_invalidate_external_his_service_api_exception, CODE_SHA256, ApiException),
+    ],
+)
+def test_invalidate_his_external_service_exceptions(
+    mock_his_service: Callable[[], ContextManager[None]], cun_sha: str, exception: Type[Exception]
+) -> None:
+    with mock_his_service():
+        with pytest.raises(exception):
+            invalidate_cun(cun_sha=cun_sha, id_test_verification=ID_TEST_VERIFICATION)
+
+
+@pytest.mark.parametrize(
+    "mock_dgc_service,token_type",
+    [
+        (mock_retrieve_dgc_success, "authcode"),
+        (mock_retrieve_dgc_no_authcode_success, "nucg"),
+        (mock_retrieve_dgc_with_cbis_success, "authcode"),
+    ],
+)
+def test_retrieve_dgc_success(
+    mock_dgc_service: Callable[[], ContextManager[None]], token_type: str
+) -> None:
+    with mock_dgc_service():
         response = retrieve_dgc(
-            token_code_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
+            token_code_sha=CODE_SHA256,
             last_his_number="12345678",
-            his_expiring_date=date.today(),
-            token_type="authcode",
+            his_expiring_date=_HIS_EXPIRING_DATE,
+            token_type=token_type,
         )
         assert response
 
 
-def test_retrieve_no_dgc_with_cbis_exception() -> None:
-    with config_set("DGC_EXTERNAL_URL", "example.com"), mock_retrieve_dgc_with_cbis_not_found():
-        try:
+@pytest.mark.parametrize(
+    "mock_dgc_service,token_type,exception",
+    [
+        (mock_retrieve_dgc_not_found, "authcode", DgcNotFoundException),
+        (mock_retrieve_dgc_api_exception1, "cun", ApiException),
+        (mock_retrieve_dgc_api_exception2, "nrfe", ApiException),
+        (mock_retrieve_dgc_api_exception3, "authcode", ApiException),
+        (mock_retrieve_dgc_api_exception4, "authcode", ApiException),
+        (mock_retrieve_dgc_with_cbis_not_found, "authcode", DgcNotFoundException),
+    ],
+)
+def test_retrieve_dgc_exceptions(
+    mock_dgc_service: Callable[[], ContextManager[None]],
+    token_type: str,
+    exception: Type[Exception],
+) -> None:
+    with mock_dgc_service():
+        with pytest.raises(exception):
             retrieve_dgc(
-                token_code_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
+                token_code_sha=CODE_SHA256,
                 last_his_number="12345678",
-                his_expiring_date=date.today(),
-                token_type="authcode",
+                his_expiring_date=_HIS_EXPIRING_DATE,
+                token_type=token_type,
             )
-        except DgcNotFoundException as e:
-            assert e
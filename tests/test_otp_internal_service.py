@@ -11,7 +11,9 @@
 #    You should have received a copy of the GNU Affero General Public License
 #    along with this program. If not, see <https://www.gnu.org/licenses/>.
 from datetime import date
-from hashlib import sha256
+from typing import Iterator
+
+import pytest
 
 from immuni_common.core.exceptions import (
     ApiException,
@@ -19,8 +21,9 @@ from immuni_common.core.exceptions import (
     SchemaValidationException,
 )
 from immuni_exposure_ingestion.helpers.otp_internal_service import enable_otp
-from tests.fixtures.core import config_set
+from tests.fixtures.core import CODE_SHA256, ID_TEST_VERIFICATION, config_set
 from tests.fixtures.otp_internal_service import (
+    INVALID_OTP_SHA256,
     mock_internal_otp_service_api_exception,
     mock_internal_otp_service_otp_collision,
     mock_internal_otp_service_schema_validation,
@@ -28,55 +31,47 @@ from tests.fixtures.otp_internal_service import (
 )
 
 
+@pytest.fixture(scope="module", autouse=True)
+def otp_internal_url() -> Iterator[None]:
+    with config_set("OTP_INTERNAL_URL", "example.com"):
+        yield
+
+
 def test_otp_internal_service() -> None:
-    with config_set("OTP_INTERNAL_URL", "example.com"), mock_internal_otp_service_success(
-        expected_content=True
-    ):
+    with mock_internal_otp_service_success(expected_content=True):
         signature = enable_otp(
-            otp_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
+            otp_sha=CODE_SHA256,
             symptoms_started_on=date.today(),
-            id_test_verification="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
+            id_test_verification=ID_TEST_VERIFICATION,
         )
         assert signature is True
 
 
 def test_otp_internal_service_schema_validation() -> None:
-    with config_set("OTP_INTERNAL_URL", "example.com"), mock_internal_otp_service_schema_validation(
-        expected_content=True
-    ):
-        try:
+    with mock_internal_otp_service_schema_validation(expected_content=True):
+        with pytest.raises(SchemaValidationException):
             enable_otp(
-                otp_sha=sha256("59FU".encode("utf-8")).hexdigest(),
+                otp_sha=INVALID_OTP_SHA256,
                 symptoms_started_on=date.today(),
-                id_test_verification="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
+                id_test_verification=ID_TEST_VERIFICATION,
             )
-        except SchemaValidationException as e:
-            assert e
 
 
 def test_otp_internal_service_otp_collision_exception() -> None:
-    with config_set("OTP_INTERNAL_URL", "example.com"), mock_internal_otp_service_otp_collision(
-        expected_content=True
-    ):
-        try:
+    with mock_internal_otp_service_otp_collision(expected_content=True):
+        with pytest.raises(OtpCollisionException):
             enable_otp(
-                otp_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
+                otp_sha=CODE_SHA256,
                 symptoms_started_on=date.today(),
-                id_test_verification="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
+                id_test_verification=ID_TEST_VERIFICATION,
             )
-        except OtpCollisionException as e:
-            assert e
 
 
 def test_otp_internal_service_api_exception() -> None:
-    with config_set("OTP_INTERNAL_URL", "example.com"), mock_internal_otp_service_api_exception(
-        expected_content=True
-    ):
-        try:
+    with mock_internal_otp_service_api_exception(expected_content=True):
+        with pytest.raises(ApiException):
             enable_otp(
-                otp_sha=sha256("59FU36KR46".encode("utf-8")).hexdigest(),
+                otp_sha=CODE_SHA256,
                 symptoms_started_on=date.today(),
-                id_test_verification="2d8af3b9-2c0a-4efc-9e15-72454f994e1f",
+                id_test_verification=ID_TEST_VERIFICATION,
             )
-        except ApiException as e:
-            assert e
@@ -17,7 +17,6 @@ from io import BytesIO
 from unittest.mock import patch
 from zipfile import ZipFile
 
-import pytest
 from freezegun import freeze_time
 from pytest import raises
 
@@ -26,6 +25,7 @@ from immuni_common.models.mongoengine.batch_file import BatchFile
 from immuni_exposure_ingestion.core import config
 from immuni_exposure_ingestion.helpers.lock import LockException, lock_concurrency
 from immuni_exposure_ingestion.models.upload import Upload
+from immuni_exposure_ingestion.models.upload_eu import UploadEu
 from immuni_exposure_ingestion.protobuf.helpers.generate_zip import batch_to_sdk_zip_file
 from immuni_exposure_ingestion.protobuf.models.schema_v1_pb2 import (
     TEKSignatureList,
@@ -66,16 +66,23 @@ async def test_process_uploads_simple() -> None:
         assert BatchFile.objects.count() == 0
 
         with freeze_time(current_time), patch(
-            "immuni_exposure_ingestion.tasks.process_uploads._LOGGER"
+            "immuni_exposure_ingestion.helpers.batch_file._LOGGER"
         ) as mock_logger:
             await _process_uploads()
             assert mock_logger.warning.call_count == 0
 
-        assert BatchFile.objects.count() == 2
+        batch_files = list(BatchFile.objects.order_by("index"))
+        assert len(batch_files) == 2
 
-        batch_file = BatchFile.objects.first()
+        batch_file = batch_files[0]
+        keys = batch_file.keys
         assert batch_file.index == 1
-        assert len(batch_file.keys) == 50
+        assert len(keys) == 50
+
+        # The EU batch follows the italian one, spanning the same period.
+        assert batch_files[1].index == 2
+        assert batch_files[1].period_start == batch_file.period_start
+        assert batch_files[1].period_end == batch_file.period_end
 
         assert batch_file.sub_batch_index == 1
         assert batch_file.sub_batch_count == 1
@@ -96,14 +103,14 @@ async def test_process_uploads_simple() -> None:
         # Hardcoded header
         assert header.strip() == config.EXPORT_BIN_HEADER
         export = TemporaryExposureKeyExport()
-        export.ParseFromString(content[16:])
-        assert len(export.keys) == len(batch_file.keys)
+        export.ParseFromString(memoryview(content)[16:])
+        assert len(export.keys) == len(keys)
         assert export.region == "222"
         assert export.start_timestamp == int(batch_file.period_start.timestamp())
         assert export.end_timestamp == int(batch_file.period_end.timestamp())
         assert export.batch_size == batch_file.sub_batch_count
         assert export.batch_num == batch_file.sub_batch_index
-        for key, pb_key in zip(batch_file.keys, export.keys):
+        for key, pb_key in zip(keys, export.keys):
             assert base64.b64decode(key.key_data) == pb_key.key_data
             assert key.rolling_start_number == pb_key.rolling_start_interval_number
 
@@ -114,8 +121,7 @@ async def test_process_uploads_simple() -> None:
 @mock_config(config, "SIGNATURE_EXTERNAL_URL", "example.com")
 @mock_config(config, "SIGNATURE_KEY_ALIAS_NAME", "alias")
 @mock_config(config, "EXCLUDE_CURRENT_DAY_TEK", False)
-@pytest.mark.parametrize("prehash", [True, False])
-async def test_process_uploads_advanced(prehash: bool) -> None:
+async def test_process_uploads_advanced() -> None:
     """
     Simulates an increase in uploads so that the second period should create two batches rather
     than only one.
@@ -135,7 +141,7 @@ async def test_process_uploads_advanced(prehash: bool) -> None:
         assert BatchFile.objects.count() == 0
 
         with freeze_time(current_time), patch(
-            "immuni_exposure_ingestion.tasks.process_uploads._LOGGER"
+            "immuni_exposure_ingestion.helpers.batch_file._LOGGER"
         ) as mock_logger:
             await _process_uploads()
             assert mock_logger.warning.call_count == 1
@@ -143,14 +149,13 @@ async def test_process_uploads_advanced(prehash: bool) -> None:
         assert BatchFile.objects.count() == 2
 
         with freeze_time(current_time + timedelta(hours=4)), patch(
-            "immuni_exposure_ingestion.tasks.process_uploads._LOGGER"
+            "immuni_exposure_ingestion.helpers.batch_file._LOGGER"
         ) as mock_logger:
             await _process_uploads()
             assert mock_logger.warning.call_count == 1
 
-        assert BatchFile.objects.count() == 3
-
-        batches = list(BatchFile.objects.order_by("index").all())
+        batches = list(BatchFile.objects.order_by("index"))
+        assert len(batches) == 3
 
         # Make sure the data is correct
         assert batches[0].index == 1
@@ -170,6 +175,36 @@ async def test_process_uploads_advanced(prehash: bool) -> None:
         assert Upload.objects.filter(to_publish=True).count() == 4
 
 
+@mock_config(config, "MAX_KEYS_PER_BATCH", 100)
+@mock_config(config, "BATCH_PERIODICITY_CRONTAB", "0 */4 * * *")
+@mock_config(config, "MAX_KEYS_PER_UPLOAD", 14)
+@mock_config(config, "SIGNATURE_EXTERNAL_URL", "example.com")
+@mock_config(config, "SIGNATURE_KEY_ALIAS_NAME", "alias")
+@mock_config(config, "EXCLUDE_CURRENT_DAY_TEK", False)
+async def test_process_uploads_eu_not_published_if_italian_batch_fails() -> None:
+    with mock_external_response():
+        current_time = datetime.utcnow()
+        generate_random_uploads(
+            5, start_time=current_time - timedelta(hours=4), end_time=current_time,
+        )
+        generate_random_uploads_eu_to_it(
+            5, start_time=current_time, end_time=current_time + timedelta(hours=4),
+        )
+
+        with freeze_time(current_time), patch(
+            "immuni_exposure_ingestion.tasks.process_uploads.Upload.set_published",
+            side_effect=RuntimeError(),
+        ), raises(RuntimeError):
+            await _process_uploads()
+
+        # The italian batch is stored before its uploads fail to be flagged as published, while
+        # the EU one is not stored at all.
+        assert BatchFile.objects.count() == 1
+        assert BatchFile.objects.filter(origin="EU").count() == 0
+        assert Upload.objects.filter(to_publish=True).count() == 5
+        assert UploadEu.objects.filter(to_publish=True).count() == 5
+
+
 @mock_config(config, "MAX_KEYS_PER_BATCH", 100)
 @mock_config(config, "BATCH_PERIODICITY_CRONTAB", "0 */4 * * *")
 @mock_config(config, "MAX_KEYS_PER_UPLOAD", 14)
@@ -192,20 +227,22 @@ async def test_process_uploads_does_not_include_todays_keys() -> None:
         assert BatchFile.objects.count() == 0
 
         with freeze_time(current_time), patch(
-            "immuni_exposure_ingestion.tasks.process_uploads._LOGGER"
+            "immuni_exposure_ingestion.helpers.batch_file._LOGGER"
         ) as mock_logger:
             await _process_uploads()
             assert mock_logger.warning.call_count == 0
 
-        assert BatchFile.objects.count() == 2
+        batch_files = list(BatchFile.objects.order_by("index"))
+        assert len(batch_files) == 2
 
-        batch_file = BatchFile.objects.first()
+        batch_file = batch_files[0]
+        keys = batch_file.keys
 
         today_rolling_start_number = int(
             current_time.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
             / timedelta(minutes=10).total_seconds()
         )
 
-        assert len(batch_file.keys) == 45
+        assert len(keys) == 45
 
-        assert all(key.rolling_start_number < today_rolling_start_number for key in batch_file.keys)
+        assert all(key.rolling_start_number < today_rolling_start_number for key in keys)
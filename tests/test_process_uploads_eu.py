@@ -17,7 +17,6 @@ from io import BytesIO
 from unittest.mock import patch
 from zipfile import ZipFile
 
-import pytest
 from freezegun import freeze_time
 from pytest import raises
 
@@ -59,18 +58,20 @@ async def test_process_uploads_eu_simple() -> None:
         assert BatchFileEu.objects.count() == 0
 
         with freeze_time(current_time), patch(
-            "immuni_exposure_ingestion.tasks.process_uploads_eu._LOGGER"
+            "immuni_exposure_ingestion.helpers.batch_file._LOGGER"
         ) as mock_logger:
             await _process_uploads_eu()
             assert mock_logger.warning.call_count == 0
 
-        assert BatchFileEu.objects.count() == 1
+        batch_files_eu = list(BatchFileEu.objects.order_by("index"))
+        assert len(batch_files_eu) == 1
 
-        batch_file_eu = BatchFileEu.objects.first()
+        batch_file_eu = batch_files_eu[0]
+        keys = batch_file_eu.keys
         assert batch_file_eu.index == 1
         # with respect to the _process_upload with should obtain 14*5 keys because we did not
         # perform any validation, we accept all the TEKs
-        assert len(batch_file_eu.keys) == 70
+        assert len(keys) == 70
 
         assert batch_file_eu.sub_batch_index == 1
         assert batch_file_eu.sub_batch_count == 1
@@ -91,14 +92,14 @@ async def test_process_uploads_eu_simple() -> None:
         # Hardcoded header
         assert header.strip() == config.EXPORT_BIN_HEADER
         export = TemporaryExposureKeyExport()
-        export.ParseFromString(content[16:])
-        assert len(export.keys) == len(batch_file_eu.keys)
+        export.ParseFromString(memoryview(content)[16:])
+        assert len(export.keys) == len(keys)
         assert export.region == "222"
         assert export.start_timestamp == int(batch_file_eu.period_start.timestamp())
         assert export.end_timestamp == int(batch_file_eu.period_end.timestamp())
         assert export.batch_size == batch_file_eu.sub_batch_count
         assert export.batch_num == batch_file_eu.sub_batch_index
-        for key, pb_key in zip(batch_file_eu.keys, export.keys):
+        for key, pb_key in zip(keys, export.keys):
             assert base64.b64decode(key.key_data) == pb_key.key_data
             assert key.rolling_start_number == pb_key.rolling_start_interval_number
 
@@ -108,8 +109,7 @@ async def test_process_uploads_eu_simple() -> None:
 @mock_config(config, "MAX_KEYS_PER_UPLOAD", 14)
 @mock_config(config, "SIGNATURE_EXTERNAL_URL", "example.com")
 @mock_config(config, "SIGNATURE_KEY_ALIAS_NAME", "alias")
-@pytest.mark.parametrize("prehash", [True, False])
-async def test_process_uploads_eu_advanced(prehash: bool) -> None:
+async def test_process_uploads_eu_advanced() -> None:
     """
     Simulates an increase in EU uploads so that the second period should create two batches rather
     than only one.
@@ -123,7 +123,7 @@ async def test_process_uploads_eu_advanced(prehash: bool) -> None:
         assert BatchFileEu.objects.count() == 0
 
         with freeze_time(current_time), patch(
-            "immuni_exposure_ingestion.tasks.process_uploads_eu._LOGGER"
+            "immuni_exposure_ingestion.helpers.batch_file._LOGGER"
         ) as mock_logger:
             await _process_uploads_eu()
             assert mock_logger.warning.call_count == 1
@@ -131,14 +131,13 @@ async def test_process_uploads_eu_advanced(prehash: bool) -> None:
         assert BatchFileEu.objects.count() == 1
 
         with freeze_time(current_time + timedelta(hours=4)), patch(
-            "immuni_exposure_ingestion.tasks.process_uploads_eu._LOGGER"
+            "immuni_exposure_ingestion.helpers.batch_file._LOGGER"
         ) as mock_logger:
             await _process_uploads_eu()
             assert mock_logger.warning.call_count == 0
 
-        assert BatchFileEu.objects.count() == 2
-
-        batches_eu = list(BatchFileEu.objects.order_by("index").all())
+        batches_eu = list(BatchFileEu.objects.order_by("index"))
+        assert len(batches_eu) == 2
 
         # Make sure the data is correct
         assert batches_eu[0].index == 1
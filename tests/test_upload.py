@@ -15,9 +15,8 @@ import json
 import time
 from copy import deepcopy
 from datetime import date, datetime, timedelta
-from hashlib import sha256
 from http import HTTPStatus
-from typing import Dict, Optional, Tuple
+from typing import Dict, Optional
 from unittest.mock import patch
 
 import pytest
@@ -33,8 +32,11 @@ from immuni_common.core.exceptions import SchemaValidationException, Unauthorize
 from immuni_common.helpers.otp import key_for_otp_sha
 from immuni_common.helpers.tests import mock_config
 from immuni_common.models.dataclasses import OtpData
+from tests.fixtures.core import STORED_OTP_SHA256
 from tests.fixtures.upload import generate_random_key_data
 
+_NOW = datetime.utcnow()
+
 UPLOAD_DATA = dict(
     province="AG",
     padding="4dd16",
@@ -60,13 +62,16 @@ UPLOAD_DATA = dict(
     teks=[
         {
             "key_data": generate_random_key_data(),
-            "rolling_start_number": int((datetime.utcnow() - timedelta(days=i)).timestamp() / 600),
+            "rolling_start_number": int((_NOW - timedelta(days=i)).timestamp() // 600),
             "rolling_period": 144,
         }
         for i in range(14)
     ],
 )
 
+# The serialized body of the tests posting UPLOAD_DATA without altering it.
+UPLOAD_DATA_BODY = json.dumps(UPLOAD_DATA)
+
 CHECK_CUN_DATA = dict(last_his_number="12345678", symptoms_started_on="2020-12-23")
 
 CHECK_CUN_DATA_NOT_REQUIRED = dict(last_his_number="12345678")
@@ -80,10 +85,24 @@ GET_DGC_DATA = dict(
 
 CONTENT_TYPE_HEADER = {"Content-Type": "application/json; charset=UTF-8"}
 
+# The client clock is validated, but otherwise ignored, by the service.
+_CLIENT_CLOCK = str(int(time.time()))
+
+_AUTH_BEARER = f"Bearer {STORED_OTP_SHA256}"
+
 
 @pytest.fixture
 def upload_data() -> Dict:
-    return deepcopy(UPLOAD_DATA)
+    # Only the top-level keys, the summaries and the TEKs are altered by the tests, so there is no
+    # need to deep copy the whole payload.
+    return {
+        **UPLOAD_DATA,
+        "exposure_detection_summaries": [
+            dict(summary, exposure_info=list(summary["exposure_info"]))
+            for summary in UPLOAD_DATA["exposure_detection_summaries"]
+        ],
+        "teks": [dict(tek) for tek in UPLOAD_DATA["teks"]],
+    }
 
 
 @pytest.fixture
@@ -103,21 +122,20 @@ def get_dgc_data() -> Dict:
 
 @pytest.fixture
 def headers() -> Dict[str, str]:
-    return {"Immuni-Dummy-Data": "0", "Immuni-Client-Clock": str(int(time.time()))}
+    return {"Immuni-Dummy-Data": "0", "Immuni-Client-Clock": _CLIENT_CLOCK, **CONTENT_TYPE_HEADER}
 
 
 @pytest.fixture
 def auth_headers(headers: Dict[str, str]) -> Dict[str, str]:
-    headers["Authorization"] = f"Bearer {sha256('12345'.encode('utf-8')).hexdigest()}"
+    headers["Authorization"] = _AUTH_BEARER
     return headers
 
 
-async def test_dummy_data_upload(
-    client: TestClient, upload_data: Dict, auth_headers: Dict[str, str]
-) -> None:
+async def test_dummy_data_upload(client: TestClient, auth_headers: Dict[str, str]) -> None:
     auth_headers["Immuni-Dummy-Data"] = "1"
-    auth_headers.update(CONTENT_TYPE_HEADER)
-    response = await client.post("/v1/ingestion/upload", json=upload_data, headers=auth_headers)
+    response = await client.post(
+        "/v1/ingestion/upload", data=UPLOAD_DATA_BODY, headers=auth_headers
+    )
     assert response.status == 204
     assert Upload.objects.count() == 0
     assert await managers.analytics_redis.llen(config.ANALYTICS_QUEUE_KEY) == 0
@@ -127,7 +145,6 @@ async def test_dummy_data_check_otp_success(
     client: TestClient, auth_headers: Dict[str, str]
 ) -> None:
     auth_headers["Immuni-Dummy-Data"] = "1"
-    auth_headers.update(CONTENT_TYPE_HEADER)
     with patch("immuni_common.helpers.sanic.weighted_random", side_effect=lambda x: x[1].payload):
         response = await client.post(
             "/v1/ingestion/check-otp", json=dict(padding="4dd1"), headers=auth_headers
@@ -139,7 +156,6 @@ async def test_dummy_data_check_otp_success(
 
 async def test_dummy_data_check_otp_fail(client: TestClient, auth_headers: Dict[str, str]) -> None:
     auth_headers["Immuni-Dummy-Data"] = "1"
-    auth_headers.update(CONTENT_TYPE_HEADER)
     with patch("immuni_common.helpers.sanic.weighted_random", side_effect=lambda x: x[0].payload):
         response = await client.post(
             "/v1/ingestion/check-otp", json=dict(padding="4dd1"), headers=auth_headers
@@ -153,17 +169,16 @@ async def test_dummy_data_check_otp_fail(client: TestClient, auth_headers: Dict[
 
 @pytest.mark.parametrize(
     "bad_data",
-    [(None, "None"), (json.dumps(dict()), "Empty Dict")]
+    [None, json.dumps(dict())]
     + [
-        (json.dumps({k: v for k, v in UPLOAD_DATA.items() if k != excluded}), excluded)
+        json.dumps({k: v for k, v in UPLOAD_DATA.items() if k != excluded})
         for excluded in UPLOAD_DATA
     ],
 )
 async def test_upload_bad_request_body(
-    client: TestClient, bad_data: Tuple[str, str], headers: Dict[str, str]
+    client: TestClient, bad_data: Optional[str], headers: Dict[str, str]
 ) -> None:
-    headers.update(CONTENT_TYPE_HEADER)
-    response = await client.post("/v1/ingestion/upload", json=bad_data[0], headers=headers,)
+    response = await client.post("/v1/ingestion/upload", json=bad_data, headers=headers)
     assert response.status == 400
     data = await response.json()
     assert data["message"] == "Request not compliant with the defined schema."
@@ -176,7 +191,6 @@ async def test_invalid_province(
     client: TestClient, upload_data: Dict, province: str, headers: Dict[str, str]
 ) -> None:
     upload_data["province"] = province
-    headers.update(CONTENT_TYPE_HEADER)
     response = await client.post("/v1/ingestion/upload", json=upload_data, headers=headers)
     assert response.status == 400
     data = await response.json()
@@ -188,7 +202,6 @@ async def test_invalid_countries(
     client: TestClient, upload_data: Dict, countries_of_interest: list, headers: Dict[str, str]
 ) -> None:
     upload_data["countries_of_interest"] = countries_of_interest
-    headers.update(CONTENT_TYPE_HEADER)
     response = await client.post("/v1/ingestion/upload", json=upload_data, headers=headers)
     assert response.status == 400
     data = await response.json()
@@ -197,11 +210,10 @@ async def test_invalid_countries(
 
 @pytest.mark.parametrize("dummy_header", ["other", "boh", ""])
 async def test_upload_bad_request_dummy_header(
-    client: TestClient, upload_data: Dict, dummy_header: str, headers: Dict[str, str]
+    client: TestClient, dummy_header: str, headers: Dict[str, str]
 ) -> None:
     headers["Immuni-Dummy-Data"] = dummy_header
-    headers.update(CONTENT_TYPE_HEADER)
-    response = await client.post("/v1/ingestion/upload", json=upload_data, headers=headers,)
+    response = await client.post("/v1/ingestion/upload", data=UPLOAD_DATA_BODY, headers=headers)
     assert response.status == 400
     data = await response.json()
     assert data["message"] == "Request not compliant with the defined schema."
@@ -220,25 +232,22 @@ async def test_upload_bad_request_dummy_header(
 )
 @pytest.mark.parametrize("token", ["asd", "12345", "abcdefghijklmnopqrstuvwxy"])
 async def test_bad_auth_token_raises_validation_error(
-    client: TestClient, upload_data: Dict, auth_headers: Dict[str, str], token: str, endpoint: str
+    client: TestClient, auth_headers: Dict[str, str], token: str, endpoint: str
 ) -> None:
     auth_headers["Authorization"] = f"Bearer {token}"
-    auth_headers.update(CONTENT_TYPE_HEADER)
-    response = await client.post(endpoint, json=upload_data, headers=auth_headers)
+    response = await client.post(endpoint, data=UPLOAD_DATA_BODY, headers=auth_headers)
     assert response.status == 400
 
     data = await response.json()
     assert data["message"] == "Request not compliant with the defined schema."
 
 
-@pytest.mark.parametrize("endpoint", ["/v1/ingestion/upload"])
 @pytest.mark.parametrize("missing_header", ["Immuni-Dummy-Data", "Immuni-Client-Clock"])
 async def test_upload_without_headers(
-    client: TestClient, endpoint: str, missing_header: str, headers: Dict[str, str]
+    client: TestClient, missing_header: str, headers: Dict[str, str]
 ) -> None:
     del headers[missing_header]
-    headers.update(CONTENT_TYPE_HEADER)
-    response = await client.post(endpoint, headers=headers)
+    response = await client.post("/v1/ingestion/upload", headers=headers)
     assert response.status == 400
     data = await response.json()
     assert data["message"] == "Request not compliant with the defined schema."
@@ -252,7 +261,6 @@ async def test_check_otp_cun_without_headers(
     client: TestClient, endpoint: str, missing_header: str, headers: Dict[str, str]
 ) -> None:
     del headers[missing_header]
-    headers.update(CONTENT_TYPE_HEADER)
     response = await client.post(endpoint, headers=headers)
     assert response.status == 400
     data = await response.json()
@@ -262,7 +270,6 @@ async def test_check_otp_cun_without_headers(
 
 
 async def test_upload_otp_check_fail(client: TestClient, auth_headers: Dict[str, str]) -> None:
-    auth_headers.update(CONTENT_TYPE_HEADER)
     response = await client.post(
         "/v1/ingestion/check-otp", json=dict(padding="4dd1"), headers=auth_headers,
     )
@@ -276,7 +283,6 @@ async def test_upload_otp_check_fail(client: TestClient, auth_headers: Dict[str,
 async def test_upload_otp_check_pass(
     client: TestClient, otp: OtpData, auth_headers: Dict[str, str]
 ) -> None:
-    auth_headers.update(CONTENT_TYPE_HEADER)
     response = await client.post(
         "/v1/ingestion/check-otp", json=dict(padding="4dd1"), headers=auth_headers,
     )
@@ -288,8 +294,6 @@ async def test_upload_otp_check_pass(
 async def test_upload_too_many_keys(
     client: TestClient, otp: OtpData, auth_headers: Dict[str, str], upload_data: Dict,
 ) -> None:
-    auth_headers.update(CONTENT_TYPE_HEADER)
-
     with patch(
         "immuni_exposure_ingestion.core.config.MAX_KEYS_PER_BATCH", len(upload_data["teks"]) - 1
     ):
@@ -305,11 +309,11 @@ async def test_upload_invalid_start_numbers(
         upload_data["teks"][1]["rolling_start_number"] + 10
     )
 
-    auth_headers.update(CONTENT_TYPE_HEADER)
     response = await client.post("/v1/ingestion/upload", json=upload_data, headers=auth_headers,)
     assert response.status == 204
-    assert Upload.objects.count() == 1
-    upload = Upload.objects.first()
+    uploads = list(Upload.objects)
+    assert len(uploads) == 1
+    upload = uploads[0]
     # teks should be discarded, as they did not pass the teks validator
     assert not upload.keys
     assert upload.to_publish is True
@@ -325,7 +329,6 @@ async def test_upload_keys_with_wrong_length(
         for _ in range(14)
     ]
 
-    auth_headers.update(CONTENT_TYPE_HEADER)
     response = await client.post("/v1/ingestion/upload", json=upload_data, headers=auth_headers)
     assert response.status == HTTPStatus.BAD_REQUEST.value
 
@@ -335,16 +338,24 @@ async def test_upload_keys_with_missing_teks(
 ) -> None:
     upload_data["teks"] = None
 
-    auth_headers.update(CONTENT_TYPE_HEADER)
     response = await client.post("/v1/ingestion/upload", json=upload_data, headers=auth_headers)
     assert response.status == HTTPStatus.BAD_REQUEST.value
 
 
 @mock_config(config, "ALLOW_NON_CONSECUTIVE_TEKS", True)
-@pytest.mark.parametrize("include_infos", [True, False])
-@pytest.mark.parametrize("include_summaries", [True, False])
-@pytest.mark.parametrize("include_teks", [True, False])
-@pytest.mark.parametrize("remove_tek", [None, *range(14)])
+@pytest.mark.parametrize(
+    "include_infos, include_summaries, include_teks, remove_tek",
+    [
+        (True, True, True, None),
+        (True, True, True, 0),
+        (True, True, True, 7),
+        (True, True, True, 13),
+        (False, True, True, None),
+        (True, False, True, None),
+        (True, True, False, None),
+        (False, False, False, None),
+    ],
+)
 async def test_upload_otp_complete(
     client: TestClient,
     otp: OtpData,
@@ -355,8 +366,6 @@ async def test_upload_otp_complete(
     include_teks: bool,
     remove_tek: Optional[int],
 ) -> None:
-    otp_sha = sha256("12345".encode("utf-8")).hexdigest()
-
     if not include_infos:
         upload_data["exposure_detection_summaries"][0]["exposure_info"] = []
     if not include_summaries:
@@ -373,14 +382,14 @@ async def test_upload_otp_complete(
             if tek["rolling_start_number"] < today_midnight_rolling_start_number()
         ]
 
-    auth_headers.update(CONTENT_TYPE_HEADER)
     response = await client.post("/v1/ingestion/upload", json=upload_data, headers=auth_headers,)
 
-    assert await managers.otp_redis.get(key_for_otp_sha(otp_sha)) is None
+    assert await managers.otp_redis.get(key_for_otp_sha(STORED_OTP_SHA256)) is None
 
     assert response.status == 204
-    assert Upload.objects.count() == 1
-    upload = Upload.objects.first()
+    uploads = list(Upload.objects)
+    assert len(uploads) == 1
+    upload = uploads[0]
     assert upload.to_publish is True
     assert upload.symptoms_started_on == otp.symptoms_started_on
 
@@ -393,8 +402,11 @@ async def test_upload_otp_complete(
     else:
         assert upload.keys == []
 
-    assert await managers.analytics_redis.llen(config.ANALYTICS_QUEUE_KEY) == 1
-    enqueued_message = await managers.analytics_redis.lpop(config.ANALYTICS_QUEUE_KEY)
+    pipe = managers.analytics_redis.pipeline()
+    pipe.llen(config.ANALYTICS_QUEUE_KEY)
+    pipe.lpop(config.ANALYTICS_QUEUE_KEY)
+    queue_length, enqueued_message = await pipe.execute()
+    assert queue_length == 1
     assert enqueued_message
     content = json.loads(enqueued_message)
 
@@ -437,7 +449,6 @@ async def test_dummy_data_check_cun_success(
     client: TestClient, auth_headers: Dict[str, str]
 ) -> None:
     auth_headers["Immuni-Dummy-Data"] = "1"
-    auth_headers.update(CONTENT_TYPE_HEADER)
     with patch("immuni_common.helpers.sanic.weighted_random", side_effect=lambda x: x[1].payload):
         response = await client.post(
             "/v1/ingestion/check-cun",
@@ -455,7 +466,6 @@ async def test_dummy_data_check_cun_success(
 
 async def test_dummy_data_check_cun_fail(client: TestClient, auth_headers: Dict[str, str]) -> None:
     auth_headers["Immuni-Dummy-Data"] = "1"
-    auth_headers.update(CONTENT_TYPE_HEADER)
     with patch("immuni_common.helpers.sanic.weighted_random", side_effect=lambda x: x[0].payload):
         response = await client.post(
             "/v1/ingestion/check-cun",
@@ -473,14 +483,9 @@ async def test_dummy_data_check_cun_fail(client: TestClient, auth_headers: Dict[
     assert await managers.analytics_redis.llen(config.ANALYTICS_QUEUE_KEY) == 0
 
 
-@pytest.mark.parametrize("endpoint", ["/v1/ingestion/check-cun"])
-@pytest.mark.parametrize("missing_header", ["Immuni-Dummy-Data"])
-async def test_check_cun_without_headers(
-    client: TestClient, endpoint: str, missing_header: str, headers: Dict[str, str]
-) -> None:
-    del headers[missing_header]
-    headers.update(CONTENT_TYPE_HEADER)
-    response = await client.post(endpoint, headers=headers)
+async def test_check_cun_without_headers(client: TestClient, headers: Dict[str, str]) -> None:
+    del headers["Immuni-Dummy-Data"]
+    response = await client.post("/v1/ingestion/check-cun", headers=headers)
     assert response.status == 400
     data = await response.json()
     assert data["message"] == "Request not compliant with the defined schema."
@@ -489,7 +494,6 @@ async def test_check_cun_without_headers(
 
 
 async def test_check_cun_fail(client: TestClient, auth_headers: Dict[str, str]) -> None:
-    auth_headers.update(CONTENT_TYPE_HEADER)
     response = await client.post(
         "/v1/ingestion/check-cun",
         json=dict(
@@ -509,7 +513,6 @@ async def test_invalid_last_his_numbers(
     client: TestClient, check_cun_data: Dict, last_his_number: str, headers: Dict[str, str]
 ) -> None:
     check_cun_data["last_his_number"] = last_his_number
-    headers.update(CONTENT_TYPE_HEADER)
     response = await client.post("/v1/ingestion/check-cun", json=check_cun_data, headers=headers)
     assert response.status == 400
     data = await response.json()
@@ -524,7 +527,6 @@ async def test_invalid_last_his_numbers_no_symptoms(
     headers: Dict[str, str],
 ) -> None:
     check_cun_data_not_required["last_his_number"] = last_his_number
-    headers.update(CONTENT_TYPE_HEADER)
     response = await client.post(
         "/v1/ingestion/check-cun", json=check_cun_data_not_required, headers=headers
     )
@@ -538,7 +540,6 @@ async def test_dummy_data_get_dgc_token_type_fail(
     client: TestClient, auth_headers: Dict[str, str], get_dgc_data: Dict, token_type: str
 ) -> None:
     # auth_headers["Immuni-Dummy-Data"] = "1"
-    auth_headers.update(CONTENT_TYPE_HEADER)
     get_dgc_data["token_type"] = token_type
     response = await client.post("/v1/ingestion/get-dgc", json=get_dgc_data, headers=auth_headers,)
 
@@ -549,7 +550,6 @@ async def test_dummy_data_get_dgc_token_type_fail(
 
 async def test_dummy_data_get_dgc_success(client: TestClient, auth_headers: Dict[str, str]) -> None:
     auth_headers["Immuni-Dummy-Data"] = "1"
-    auth_headers.update(CONTENT_TYPE_HEADER)
     with patch("immuni_common.helpers.sanic.weighted_random", side_effect=lambda x: x[1].payload):
         response = await client.post(
             "/v1/ingestion/get-dgc",
@@ -566,7 +566,6 @@ async def test_dummy_data_get_dgc_success(client: TestClient, auth_headers: Dict
 
 async def test_dummy_data_get_dgc_fail(client: TestClient, auth_headers: Dict[str, str]) -> None:
     auth_headers["Immuni-Dummy-Data"] = "1"
-    auth_headers.update(CONTENT_TYPE_HEADER)
     with patch("immuni_common.helpers.sanic.weighted_random", side_effect=lambda x: x[0].payload):
         response = await client.post(
             "/v1/ingestion/get-dgc",
@@ -588,7 +587,6 @@ async def test_invalid_his_expiring_date(
     client: TestClient, get_dgc_data: Dict, his_expiring_date: date, headers: Dict[str, str]
 ) -> None:
     get_dgc_data["his_expiring_date"] = his_expiring_date
-    headers.update(CONTENT_TYPE_HEADER)
     response = await client.post("/v1/ingestion/get-dgc", json=get_dgc_data, headers=headers)
     assert response.status == 400
     data = await response.json()
@@ -600,7 +598,6 @@ async def test_invalid_last_his_numbers_dgc(
     client: TestClient, get_dgc_data: Dict, last_his_number: str, headers: Dict[str, str],
 ) -> None:
     get_dgc_data["last_his_number"] = last_his_number
-    headers.update(CONTENT_TYPE_HEADER)
     response = await client.post("/v1/ingestion/get-dgc", json=get_dgc_data, headers=headers)
     assert response.status == 400
     data = await response.json()
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, List, Tuple
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -20,50 +20,54 @@ from immuni_exposure_ingestion.models.validators import (
 )
 from tests.fixtures.upload import generate_random_key_data
 
+_VALIDATOR = TekListValidator()
 
-@pytest.fixture()
-def teks() -> List[TemporaryExposureKey]:
+
+@pytest.fixture(scope="module")
+def tek_template() -> Tuple[Dict[str, Any], ...]:
     starting_period = _datetime_to_rolling_start_number(
         datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=14)
     )
-    return [
-        TemporaryExposureKey(
+    return tuple(
+        dict(
             key_data=generate_random_key_data(),
             rolling_period=144,
             rolling_start_number=starting_period + 144 * i,
         )
         for i in range(15)
-    ]
+    )
+
+
+def _build_teks(tek_template: Tuple[Dict[str, Any], ...]) -> List[TemporaryExposureKey]:
+    return [TemporaryExposureKey(**tek) for tek in tek_template]
+
+
+@pytest.fixture()
+def teks(tek_template: Tuple[Dict[str, Any], ...]) -> List[TemporaryExposureKey]:
+    return _build_teks(tek_template)
 
 
 async def test_tek_key_validator_pass_if_empty() -> None:
-    TekListValidator().__call__([])
+    _VALIDATOR([])
 
 
 @pytest.mark.parametrize(
-    "key_index, out_of_range_rolling_period",
-    (
-        (key_index, out_of_range_rolling_period)
-        for key_index in range(15)
-        for out_of_range_rolling_period in {
-            -1,
-            _ROLLING_PERIOD_MIN - 1,
-            _ROLLING_PERIOD_MAX + 1,
-            1024,
-        }
-    ),
+    "out_of_range_rolling_period", [-1, _ROLLING_PERIOD_MIN - 1, _ROLLING_PERIOD_MAX + 1, 1024]
 )
 async def test_tek_key_validator_fails_on_out_of_range_rolling_period(
-    teks: List[TemporaryExposureKey], key_index: int, out_of_range_rolling_period: int
+    teks: List[TemporaryExposureKey], out_of_range_rolling_period: int
 ) -> None:
-    teks[key_index].rolling_period = out_of_range_rolling_period
-    with raises(ValidationError) as err:
-        TekListValidator().__call__(teks)
-
-    assert err.value.messages[0] == (
-        f"Some rolling_period values are not in "
-        f"[{_ROLLING_PERIOD_MIN},{_ROLLING_PERIOD_MAX}] (e.g., {out_of_range_rolling_period})."
-    )
+    for tek in teks:
+        rolling_period = tek.rolling_period
+        tek.rolling_period = out_of_range_rolling_period
+        with raises(ValidationError) as err:
+            _VALIDATOR(teks)
+
+        assert err.value.messages[0] == (
+            f"Some rolling_period values are not in "
+            f"[{_ROLLING_PERIOD_MIN},{_ROLLING_PERIOD_MAX}] (e.g., {out_of_range_rolling_period})."
+        )
+        tek.rolling_period = rolling_period
 
 
 async def test_tek_key_validator_fails_on_future_rolling_start_number(
@@ -72,7 +76,7 @@ async def test_tek_key_validator_fails_on_future_rolling_start_number(
     for tek in teks:
         tek.rolling_start_number += 144
     with raises(ValidationError) as err:
-        TekListValidator().__call__(teks)
+        _VALIDATOR(teks)
 
     assert err.value.messages[0] == (
         f"Some rolling_start_number values are in the future "
@@ -81,60 +85,64 @@ async def test_tek_key_validator_fails_on_future_rolling_start_number(
 
 
 async def test_tek_key_validator_pass_with_correct_teks(teks: List[TemporaryExposureKey]) -> None:
-    TekListValidator().__call__(teks)
+    _VALIDATOR(teks)
 
 
 @mock_config(config, "MAX_KEYS_PER_UPLOAD", 3)
 async def test_tek_key_validator_fails_if_too_many_teks(teks: List[TemporaryExposureKey]) -> None:
     with raises(ValidationError) as err:
-        TekListValidator().__call__(teks)
+        _VALIDATOR(teks)
 
     assert err.value.messages[0] == f"Too many TEKs. (actual: {len(teks)}, max_allowed: 3)."
 
 
-@pytest.mark.parametrize("duplicated_index", range(1, 13))
 async def test_tek_key_validator_fails_with_duplicated_start_number_and_rolling_period(
-    teks: List[TemporaryExposureKey], duplicated_index: int
+    tek_template: Tuple[Dict[str, Any], ...]
 ) -> None:
-    teks[duplicated_index]["rolling_start_number"] = teks[0]["rolling_start_number"]
-    teks[duplicated_index]["rolling_period"] = teks[0]["rolling_period"]
-    with raises(ValidationError) as err:
-        TekListValidator().__call__(teks)
-
-    assert (
-        err.value.messages[0] == "TEKs do not have unique (rolling_start_number, rolling_period)."
-    )
+    for duplicated_index in range(1, 13):
+        teks = _build_teks(tek_template)
+        teks[duplicated_index]["rolling_start_number"] = teks[0]["rolling_start_number"]
+        teks[duplicated_index]["rolling_period"] = teks[0]["rolling_period"]
+        with raises(ValidationError) as err:
+            _VALIDATOR(teks)
+
+        assert (
+            err.value.messages[0]
+            == "TEKs do not have unique (rolling_start_number, rolling_period)."
+        )
 
 
-@pytest.mark.parametrize("overlapping_index", range(1, 13))
 async def test_tek_key_validator_fails_with_overlapping_periods(
-    teks: List[TemporaryExposureKey], overlapping_index: int
+    tek_template: Tuple[Dict[str, Any], ...]
 ) -> None:
-    overlapping_start_number = teks[0]["rolling_start_number"] + 1
-    teks[overlapping_index]["rolling_start_number"] = overlapping_start_number
-    with raises(ValidationError) as err:
-        TekListValidator().__call__(teks)
-
-    assert (
-        err.value.messages[0]
-        == f"There are invalid rolling_start_number values (i.e., {overlapping_start_number})."
-    )
+    overlapping_start_number = tek_template[0]["rolling_start_number"] + 1
+    for overlapping_index in range(1, 13):
+        teks = _build_teks(tek_template)
+        teks[overlapping_index]["rolling_start_number"] = overlapping_start_number
+        with raises(ValidationError) as err:
+            _VALIDATOR(teks)
+
+        assert (
+            err.value.messages[0]
+            == f"There are invalid rolling_start_number values (i.e., {overlapping_start_number})."
+        )
 
 
 @mock_config(config, "ALLOW_NON_CONSECUTIVE_TEKS", False)
-@pytest.mark.parametrize("missing_index", range(1, 12))
 async def test_tek_key_validator_fails_with_missing_teks(
-    teks: List[TemporaryExposureKey], missing_index: int
+    tek_template: Tuple[Dict[str, Any], ...]
 ) -> None:
-    missing_rolling_start_number = teks[missing_index].rolling_start_number
-    del teks[missing_index]
-    with raises(ValidationError) as err:
-        TekListValidator().__call__(teks)
-
-    assert (
-        err.value.messages[0]
-        == f"Some rolling_start_numbers are missing (i.e., {missing_rolling_start_number})."
-    )
+    for missing_index in range(1, 12):
+        teks = _build_teks(tek_template)
+        missing_rolling_start_number = teks[missing_index].rolling_start_number
+        del teks[missing_index]
+        with raises(ValidationError) as err:
+            _VALIDATOR(teks)
+
+        assert (
+            err.value.messages[0]
+            == f"Some rolling_start_numbers are missing (i.e., {missing_rolling_start_number})."
+        )
 
 
 @patch("immuni_exposure_ingestion.models.validators._LOGGER.info")
@@ -143,12 +151,11 @@ async def test_tek_key_validator_finds_todays_teks(
 ) -> None:
     teks = teks[:1]
     teks[0].rolling_start_number = today_midnight_rolling_start_number()
-    TekListValidator().__call__(teks)
+    _VALIDATOR(teks)
     logger.assert_called_with(
         "There are today's TEKs. " "They could be later ignored based on a configuration variable.",
         extra=dict(
             n_teks=len(teks),
-            n_valid_teks=len(teks),
             n_today_teks=len(teks),
             today_rolling_periods=list(tek.rolling_period for tek in teks),
             EXCLUDE_CURRENT_DAY_TEK=config.EXCLUDE_CURRENT_DAY_TEK,